@@ -1,3 +1,4 @@
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 from .state import AgentState
 from .nodes import parse, geocode, route, format
@@ -5,10 +6,13 @@ from .nodes import parse, geocode, route, format
 def build_graph():
     graph = StateGraph(AgentState)
 
-    graph.add_node("parse", parse.parse_node)
-    graph.add_node("geocode", geocode.geocode_node)
-    graph.add_node("route", route.route_node)
-    graph.add_node("format", format.format_node)
+    # Each node has a blocking and an async implementation: graph.invoke/stream
+    # use the former, graph.ainvoke/astream the latter (no thread held while
+    # waiting on Gemini or the router).
+    graph.add_node("parse", RunnableLambda(parse.parse_node, afunc=parse.parse_node_async))
+    graph.add_node("geocode", RunnableLambda(geocode.geocode_node, afunc=geocode.geocode_node_async))
+    graph.add_node("route", RunnableLambda(route.route_node, afunc=route.route_node_async))
+    graph.add_node("format", RunnableLambda(format.format_node, afunc=format.format_node_async))
 
     graph.set_entry_point("parse")
 
@@ -1,21 +1,13 @@
 import time
 
-from app.services.format_output import format_server_journeys_for_user_llm
+from app.services.format_output import (
+    format_server_journeys_for_user_llm,
+    format_server_journeys_for_user_llm_async,
+)
 
 
-def format_node(state: dict) -> dict:
-    """
-    state متوقع فيه:
-    - route_response
-    - origin
-    - destination
-    """
-    print("[FORMAT] Starting format node")
-    start = time.time()
-
+def _best_journeys(state: dict) -> list:
     route_response = state.get("route_response")
-    origin = state.get("origin")
-    dest = state.get("destination")
 
     journeys = (route_response or {}).get("journeys", []) if isinstance(route_response, dict) else []
     print(f"[FORMAT] Got {len(journeys)} journeys to format")
@@ -29,13 +21,26 @@ def format_node(state: dict) -> dict:
             float(summary.get("total_time_minutes", 0)),
         )
 
-    best_journeys = sorted(journeys, key=_rank)[:5]
+    return sorted(journeys, key=_rank)[:5]
+
+
+def format_node(state: dict) -> dict:
+    """
+    state متوقع فيه:
+    - route_response
+    - origin
+    - destination
+    """
+    print("[FORMAT] Starting format node")
+    start = time.time()
+
+    best_journeys = _best_journeys(state)
 
     # 2️⃣ formatting (LLM)
     user_text = format_server_journeys_for_user_llm(
         journeys=best_journeys,
-        origin=origin,
-        dest=dest
+        origin=state.get("origin"),
+        dest=state.get("destination")
     )
 
     print(f"[FORMAT] Done in {time.time()-start:.1f}s")
@@ -45,3 +50,24 @@ def format_node(state: dict) -> dict:
         **state,
         "final_answer": user_text
     }
+
+
+async def format_node_async(state: dict) -> dict:
+    """format_node with the Gemini call awaited instead of blocking a thread."""
+    print("[FORMAT] Starting format node")
+    start = time.time()
+
+    best_journeys = _best_journeys(state)
+
+    user_text = await format_server_journeys_for_user_llm_async(
+        journeys=best_journeys,
+        origin=state.get("origin"),
+        dest=state.get("destination")
+    )
+
+    print(f"[FORMAT] Done in {time.time()-start:.1f}s")
+
+    return {
+        **state,
+        "final_answer": user_text
+    }
@@ -1,9 +1,23 @@
 #geocode.py
+import asyncio
+import os
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
-from app.services.geocoding_serv import geocode_address
+from app.services.geocoding_serv import geocode_candidates, resolve_candidates, resolve_pair
 from app.graph.state import AgentState
 
+# Shared by all sessions; each query uses two workers (origin + destination).
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("GEOCODE_WORKERS", "8")),
+    thread_name_prefix="geocode",
+)
+
+
+def _failed(res) -> bool:
+    return res is None or "error" in res
+
+
 def geocode_node(state: AgentState) -> AgentState:
     if not state.get("origin") or not state.get("destination"):
         print("[GEOCODE] Skipping - no origin/destination")
@@ -11,15 +25,47 @@ def geocode_node(state: AgentState) -> AgentState:
 
     print(f"[GEOCODE] Starting geocode for: {state.get('origin')} -> {state.get('destination')}")
     start = time.time()
-    
-    s = geocode_address(state["origin"]) or {"error": True}
-    print(f"[GEOCODE] Origin done in {time.time()-start:.1f}s: {s}")
-    
-    e = geocode_address(state["destination"]) or {"error": True}
-    print(f"[GEOCODE] Destination done in {time.time()-start:.1f}s: {e}")
 
-    state["origin_geo"] = None if "error" in s else {"lat": s["lat"], "lon": s["lon"]}
-    state["destination_geo"] = None if "error" in e else {"lat": e["lat"], "lon": e["lon"]}
+    # Geocode both ends concurrently under one deadline; as soon as one side
+    # fails the answer is already "couldn't locate", so stop waiting for the
+    # other. (A lookup that is already running can't be interrupted; it
+    # finishes in the background and still fills the geocode cache.)
+    deadline = start + float(os.getenv("GEOCODE_DEADLINE_S", "15"))
+    futures = {
+        _executor.submit(geocode_candidates, state["origin"]): "origin",
+        _executor.submit(geocode_candidates, state["destination"]): "destination",
+    }
+    results = {"origin": None, "destination": None}
+
+    pending = set(futures)
+    while pending:
+        done, pending = wait(pending, timeout=max(0.0, deadline - time.time()), return_when=FIRST_COMPLETED)
+        if not done:
+            print(f"[GEOCODE] Deadline hit after {time.time()-start:.1f}s")
+            break
+        for f in done:
+            side = futures[f]
+            try:
+                results[side] = f.result() or {"error": True}
+            except Exception as e:
+                results[side] = {"error": str(e)}
+            print(f"[GEOCODE] {side.capitalize()} done in {time.time()-start:.1f}s: {results[side]}")
+        if any(_failed(results[futures[f]]) for f in done):
+            break
+
+    for f in pending:
+        f.cancel()
+
+    s = results["origin"]
+    e = results["destination"]
+    if not _failed(s) and not _failed(e):
+        # Ambiguous stop names are settled against the other endpoint.
+        s, e = resolve_pair(s, e)
+    else:
+        s = None if _failed(s) else resolve_candidates(s)
+        e = None if _failed(e) else resolve_candidates(e)
+    state["origin_geo"] = None if s is None else {"lat": s["lat"], "lon": s["lon"]}
+    state["destination_geo"] = None if e is None else {"lat": e["lat"], "lon": e["lon"]}
 
     if state["origin_geo"] is None or state["destination_geo"] is None:
         state["error"] = "geocoding_failed"
@@ -27,3 +73,9 @@ def geocode_node(state: AgentState) -> AgentState:
 
     print(f"[GEOCODE] Complete in {time.time()-start:.1f}s")
     return state
+
+
+async def geocode_node_async(state: AgentState) -> AgentState:
+    # Lookups are Postgres/in-memory/rate-limited HTTP calls on blocking
+    # clients; run the node off the event loop.
+    return await asyncio.to_thread(geocode_node, state)
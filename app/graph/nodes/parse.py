@@ -1,15 +1,24 @@
 #parse.py
+import os
 import time
 
-from app.services.llm import llm_parse
+from app.services.fast_parse import fast_parse
+from app.services.llm import llm_parse, llm_parse_async
 from app.graph.state import AgentState
 
-def parse_node(state: AgentState) -> AgentState:
-    print(f"[PARSE] Starting parse for query: {state.get('query', '')[:50]}")
-    start = time.time()
-    
-    result = llm_parse(state["query"])
-    
+
+def _fast_result(state: AgentState):
+    # Template-shaped queries are parsed by rules + the stop gazetteer; only
+    # low-confidence ones pay for the LLM round trip.
+    if os.getenv("FAST_PARSE", "1") != "0":
+        fast = fast_parse(state["query"])
+        if fast["confidence"] >= float(os.getenv("FAST_PARSE_MIN_CONFIDENCE", "0.6")):
+            print(f"[PARSE] Fast path (confidence {fast['confidence']:.2f})")
+            return fast
+    return None
+
+
+def _apply(state: AgentState, result: dict, start: float) -> AgentState:
     print(f"[PARSE] Done in {time.time()-start:.1f}s -> origin={result.get('origin')}, dest={result.get('destination')}")
 
     state["origin"] = result.get("origin")
@@ -19,3 +28,25 @@ def parse_node(state: AgentState) -> AgentState:
         state["error"] = "parse_failed"
 
     return state
+
+
+def parse_node(state: AgentState) -> AgentState:
+    print(f"[PARSE] Starting parse for query: {state.get('query', '')[:50]}")
+    start = time.time()
+    
+    result = _fast_result(state)
+    if result is None:
+        result = llm_parse(state["query"])
+    
+    return _apply(state, result, start)
+
+
+async def parse_node_async(state: AgentState) -> AgentState:
+    print(f"[PARSE] Starting parse for query: {state.get('query', '')[:50]}")
+    start = time.time()
+
+    result = _fast_result(state)
+    if result is None:
+        result = await llm_parse_async(state["query"])
+
+    return _apply(state, result, start)
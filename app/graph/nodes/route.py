@@ -1,31 +1,28 @@
 #route.py
 import time
 
-from app.services.routing_client import find_route
+from app.services.routing_client import find_route, find_route_async
 from app.graph.state import AgentState
 
 
-def route_node(state: AgentState) -> AgentState:
-    if not state.get("origin_geo") or not state.get("destination_geo"):
-        print("[ROUTE] Skipping - no coordinates")
-        state["error"] = "missing_coordinates"
-        return state
-
+def _route_kwargs(state: AgentState) -> dict:
     s = state["origin_geo"]
     e = state["destination_geo"]
-
-    print(f"[ROUTE] Starting route from {s} to {e}")
-    start = time.time()
-
-    route_response = find_route(
+    return dict(
         start_lat=s["lat"],
         start_lon=s["lon"],
         end_lat=e["lat"],
         end_lon=e["lon"],
         walking_cutoff=state.get("walking_cutoff", 1000.0),
         max_transfers=state.get("max_transfers", 2),
+        # format node only reads summaries/names/durations/fares: skip geometry
+        # on the wire and don't convert journeys it never looks at
+        include_geometry=False,
+        lazy=True,
     )
 
+
+def _apply(state: AgentState, route_response: dict, start: float) -> AgentState:
     print(f"[ROUTE] Done in {time.time()-start:.1f}s -> {route_response.get('num_journeys')} journeys")
 
     if route_response.get("error"):
@@ -35,3 +32,29 @@ def route_node(state: AgentState) -> AgentState:
 
     state["route_response"] = route_response
     return state
+
+
+def route_node(state: AgentState) -> AgentState:
+    if not state.get("origin_geo") or not state.get("destination_geo"):
+        print("[ROUTE] Skipping - no coordinates")
+        state["error"] = "missing_coordinates"
+        return state
+
+    print(f"[ROUTE] Starting route from {state['origin_geo']} to {state['destination_geo']}")
+    start = time.time()
+
+    route_response = find_route(**_route_kwargs(state))
+    return _apply(state, route_response, start)
+
+
+async def route_node_async(state: AgentState) -> AgentState:
+    if not state.get("origin_geo") or not state.get("destination_geo"):
+        print("[ROUTE] Skipping - no coordinates")
+        state["error"] = "missing_coordinates"
+        return state
+
+    print(f"[ROUTE] Starting route from {state['origin_geo']} to {state['destination_geo']}")
+    start = time.time()
+
+    route_response = await find_route_async(**_route_kwargs(state))
+    return _apply(state, route_response, start)
@@ -24,39 +24,47 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rrouting.proto\x12\x07routing\"\x0f\n\rHealthRequest\"1\n\x0eHealthResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\"\xd8\x01\n\x0cRouteRequest\x12\x11\n\tstart_lon\x18\x01 \x01(\x01\x12\x11\n\tstart_lat\x18\x02 \x01(\x01\x12\x0f\n\x07\x65nd_lon\x18\x03 \x01(\x01\x12\x0f\n\x07\x65nd_lat\x18\x04 \x01(\x01\x12\x15\n\rmax_transfers\x18\x05 \x01(\x05\x12\x16\n\x0ewalking_cutoff\x18\x06 \x01(\x01\x12\x18\n\x10restricted_modes\x18\x07 \x03(\t\x12(\n\x07weights\x18\x08 \x01(\x0b\x32\x17.routing.RoutingWeights\x12\r\n\x05top_k\x18\t \x01(\x05\"L\n\x0eRoutingWeights\x12\x0c\n\x04time\x18\x01 \x01(\x01\x12\x0c\n\x04\x63ost\x18\x02 \x01(\x01\x12\x0c\n\x04walk\x18\x03 \x01(\x01\x12\x10\n\x08transfer\x18\x04 \x01(\x01\"\xa8\x01\n\rRouteResponse\x12\x14\n\x0cnum_journeys\x18\x01 \x01(\x05\x12\"\n\x08journeys\x18\x02 \x03(\x0b\x32\x10.routing.Journey\x12\x19\n\x11start_trips_found\x18\x03 \x01(\x05\x12\x17\n\x0f\x65nd_trips_found\x18\x04 \x01(\x05\x12\x1a\n\x12total_routes_found\x18\x05 \x01(\x05\x12\r\n\x05\x65rror\x18\x06 \x01(\t\"q\n\x07Journey\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x14\n\x0ctext_summary\x18\x02 \x01(\t\x12(\n\x07summary\x18\x03 \x01(\x0b\x32\x17.routing.JourneySummary\x12\x1a\n\x04legs\x18\x04 \x03(\x0b\x32\x0c.routing.Leg\"\x9c\x01\n\x0eJourneySummary\x12\x1a\n\x12total_time_minutes\x18\x01 \x01(\x05\x12\x1d\n\x15total_distance_meters\x18\x02 \x01(\x05\x12\x1f\n\x17walking_distance_meters\x18\x03 \x01(\x05\x12\x11\n\ttransfers\x18\x04 \x01(\x05\x12\x0c\n\x04\x63ost\x18\x05 \x01(\x01\x12\r\n\x05modes\x18\x06 \x03(\t\"\x7f\n\x03Leg\x12 \n\x04walk\x18\x01 \x01(\x0b\x32\x10.routing.WalkLegH\x00\x12 \n\x04trip\x18\x02 \x01(\x0b\x32\x10.routing.TripLegH\x00\x12(\n\x08transfer\x18\x03 \x01(\x0b\x32\x14.routing.TransferLegH\x00\x42\n\n\x08leg_type\"_\n\x07WalkLeg\x12\x17\n\x0f\x64istance_meters\x18\x01 \x01(\x05\x12\x18\n\x10\x64uration_minutes\x18\x02 \x01(\x05\x12!\n\x04path\x18\x03 \x03(\x0b\x32\x13.routing.Coordinate\"\xd7\x01\n\x07TripLeg\x12\x0f\n\x07trip_id\x18\x01 \x01(\t\x12\x0c\n\x04mode\x18\x02 \x01(\t\x12\x18\n\x10route_short_name\x18\x03 \x01(\t\x12\x10\n\x08headsign\x18\x04 \x01(\t\x12\x0c\n\x04\x66\x61re\x18\x05 \x01(\x01\x12\x18\n\x10\x64uration_minutes\x18\x06 \x01(\x05\x12\x1b\n\x04\x66rom\x18\x07 \x01(\x0b\x32\r.routing.Stop\x12\x19\n\x02to\x18\x08 \x01(\x0b\x32\r.routing.Stop\x12!\n\x04path\x18\t \x03(\x0b\x32\x13.routing.Coordinate\"\xc3\x01\n\x0bTransferLeg\x12\x14\n\x0c\x66rom_trip_id\x18\x01 \x01(\t\x12\x12\n\nto_trip_id\x18\x02 \x01(\t\x12\x16\n\x0e\x66rom_trip_name\x18\x03 \x01(\t\x12\x14\n\x0cto_trip_name\x18\x04 \x01(\t\x12\x1f\n\x17walking_distance_meters\x18\x05 \x01(\x05\x12\x18\n\x10\x64uration_minutes\x18\x06 \x01(\x05\x12!\n\x04path\x18\x07 \x03(\x0b\x32\x13.routing.Coordinate\"I\n\x04Stop\x12\x0f\n\x07stop_id\x18\x01 \x01(\x05\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\"\n\x05\x63oord\x18\x03 \x01(\x0b\x32\x13.routing.Coordinate\"&\n\nCoordinate\x12\x0b\n\x03lon\x18\x01 \x01(\x01\x12\x0b\n\x03lat\x18\x02 \x01(\x01\x32\x90\x01\n\x0eRoutingService\x12@\n\x0bHealthCheck\x12\x16.routing.HealthRequest\x1a\x17.routing.HealthResponse\"\x00\x12<\n\tFindRoute\x12\x15.routing.RouteRequest\x1a\x16.routing.RouteResponse\"\x00\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rrouting.proto\x12\x07routing\"\x0f\n\rHealthRequest\"1\n\x0eHealthResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\"\xba\x02\n\x0cRouteRequest\x12\x11\n\tstart_lon\x18\x01 \x01(\x01\x12\x11\n\tstart_lat\x18\x02 \x01(\x01\x12\x0f\n\x07\x65nd_lon\x18\x03 \x01(\x01\x12\x0f\n\x07\x65nd_lat\x18\x04 \x01(\x01\x12\x15\n\rmax_transfers\x18\x05 \x01(\x05\x12\x16\n\x0ewalking_cutoff\x18\x06 \x01(\x01\x12\x18\n\x10restricted_modes\x18\x07 \x03(\t\x12(\n\x07weights\x18\x08 \x01(\x0b\x32\x17.routing.RoutingWeights\x12\r\n\x05top_k\x18\t \x01(\x05\x12,\n\rpath_encoding\x18\n \x01(\x0e\x32\x15.routing.PathEncoding\x12\x1d\n\x10include_geometry\x18\x0b \x01(\x08H\x00\x88\x01\x01\x42\x13\n\x11_include_geometry\"L\n\x0eRoutingWeights\x12\x0c\n\x04time\x18\x01 \x01(\x01\x12\x0c\n\x04\x63ost\x18\x02 \x01(\x01\x12\x0c\n\x04walk\x18\x03 \x01(\x01\x12\x10\n\x08transfer\x18\x04 \x01(\x01\"\xa8\x01\n\rRouteResponse\x12\x14\n\x0cnum_journeys\x18\x01 \x01(\x05\x12\"\n\x08journeys\x18\x02 \x03(\x0b\x32\x10.routing.Journey\x12\x19\n\x11start_trips_found\x18\x03 \x01(\x05\x12\x17\n\x0f\x65nd_trips_found\x18\x04 \x01(\x05\x12\x1a\n\x12total_routes_found\x18\x05 \x01(\x05\x12\r\n\x05\x65rror\x18\x06 \x01(\t\"<\n\x11\x42\x61tchRouteRequest\x12\'\n\x08requests\x18\x01 \x03(\x0b\x32\x15.routing.RouteRequest\"m\n\x0e\x42\x61tchRouteItem\x12\r\n\x05index\x18\x01 \x01(\x05\x12(\n\x08response\x18\x02 \x01(\x0b\x32\x16.routing.RouteResponse\x12\x13\n\x0bstatus_code\x18\x03 \x01(\x05\x12\r\n\x05\x65rror\x18\x04 \x01(\t\">\n\x12\x42\x61tchRouteResponse\x12(\n\x07results\x18\x01 \x03(\x0b\x32\x17.routing.BatchRouteItem\"q\n\x07Journey\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x14\n\x0ctext_summary\x18\x02 \x01(\t\x12(\n\x07summary\x18\x03 \x01(\x0b\x32\x17.routing.JourneySummary\x12\x1a\n\x04legs\x18\x04 \x03(\x0b\x32\x0c.routing.Leg\"\x9c\x01\n\x0eJourneySummary\x12\x1a\n\x12total_time_minutes\x18\x01 \x01(\x05\x12\x1d\n\x15total_distance_meters\x18\x02 \x01(\x05\x12\x1f\n\x17walking_distance_meters\x18\x03 \x01(\x05\x12\x11\n\ttransfers\x18\x04 \x01(\x05\x12\x0c\n\x04\x63ost\x18\x05 \x01(\x01\x12\r\n\x05modes\x18\x06 \x03(\t\"\x7f\n\x03Leg\x12 \n\x04walk\x18\x01 \x01(\x0b\x32\x10.routing.WalkLegH\x00\x12 \n\x04trip\x18\x02 \x01(\x0b\x32\x10.routing.TripLegH\x00\x12(\n\x08transfer\x18\x03 \x01(\x0b\x32\x14.routing.TransferLegH\x00\x42\n\n\x08leg_type\"\x9a\x01\n\x07WalkLeg\x12\x17\n\x0f\x64istance_meters\x18\x01 \x01(\x05\x12\x18\n\x10\x64uration_minutes\x18\x02 \x01(\x05\x12!\n\x04path\x18\x03 \x03(\x0b\x32\x13.routing.Coordinate\x12\x10\n\x08path_lon\x18\x04 \x03(\x01\x12\x10\n\x08path_lat\x18\x05 \x03(\x01\x12\x15\n\rpath_polyline\x18\x06 \x01(\t\"\x92\x02\n\x07TripLeg\x12\x0f\n\x07trip_id\x18\x01 \x01(\t\x12\x0c\n\x04mode\x18\x02 \x01(\t\x12\x18\n\x10route_short_name\x18\x03 \x01(\t\x12\x10\n\x08headsign\x18\x04 \x01(\t\x12\x0c\n\x04\x66\x61re\x18\x05 \x01(\x01\x12\x18\n\x10\x64uration_minutes\x18\x06 \x01(\x05\x12\x1b\n\x04\x66rom\x18\x07 \x01(\x0b\x32\r.routing.Stop\x12\x19\n\x02to\x18\x08 \x01(\x0b\x32\r.routing.Stop\x12!\n\x04path\x18\t \x03(\x0b\x32\x13.routing.Coordinate\x12\x10\n\x08path_lon\x18\n \x03(\x01\x12\x10\n\x08path_lat\x18\x0b \x03(\x01\x12\x15\n\rpath_polyline\x18\x0c \x01(\t\"\xfe\x01\n\x0bTransferLeg\x12\x14\n\x0c\x66rom_trip_id\x18\x01 \x01(\t\x12\x12\n\nto_trip_id\x18\x02 \x01(\t\x12\x16\n\x0e\x66rom_trip_name\x18\x03 \x01(\t\x12\x14\n\x0cto_trip_name\x18\x04 \x01(\t\x12\x1f\n\x17walking_distance_meters\x18\x05 \x01(\x05\x12\x18\n\x10\x64uration_minutes\x18\x06 \x01(\x05\x12!\n\x04path\x18\x07 \x03(\x0b\x32\x13.routing.Coordinate\x12\x10\n\x08path_lon\x18\x08 \x03(\x01\x12\x10\n\x08path_lat\x18\t \x03(\x01\x12\x15\n\rpath_polyline\x18\n \x01(\t\"I\n\x04Stop\x12\x0f\n\x07stop_id\x18\x01 \x01(\x05\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\"\n\x05\x63oord\x18\x03 \x01(\x0b\x32\x13.routing.Coordinate\"&\n\nCoordinate\x12\x0b\n\x03lon\x18\x01 \x01(\x01\x12\x0b\n\x03lat\x18\x02 \x01(\x01*c\n\x0cPathEncoding\x12\x1d\n\x19PATH_ENCODING_COORDINATES\x10\x00\x12\x18\n\x14PATH_ENCODING_PACKED\x10\x01\x12\x1a\n\x16PATH_ENCODING_POLYLINE\x10\x02\x32\x9e\x02\n\x0eRoutingService\x12@\n\x0bHealthCheck\x12\x16.routing.HealthRequest\x1a\x17.routing.HealthResponse\"\x00\x12<\n\tFindRoute\x12\x15.routing.RouteRequest\x1a\x16.routing.RouteResponse\"\x00\x12L\n\x0f\x46indRoutesBatch\x12\x1a.routing.BatchRouteRequest\x1a\x1b.routing.BatchRouteResponse\"\x00\x12>\n\x0f\x46indRouteStream\x12\x15.routing.RouteRequest\x1a\x10.routing.Journey\"\x00\x30\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'routing_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
+  _globals['_PATHENCODING']._serialized_start=2106
+  _globals['_PATHENCODING']._serialized_end=2205
   _globals['_HEALTHREQUEST']._serialized_start=26
   _globals['_HEALTHREQUEST']._serialized_end=41
   _globals['_HEALTHRESPONSE']._serialized_start=43
   _globals['_HEALTHRESPONSE']._serialized_end=92
   _globals['_ROUTEREQUEST']._serialized_start=95
-  _globals['_ROUTEREQUEST']._serialized_end=311
-  _globals['_ROUTINGWEIGHTS']._serialized_start=313
-  _globals['_ROUTINGWEIGHTS']._serialized_end=389
-  _globals['_ROUTERESPONSE']._serialized_start=392
-  _globals['_ROUTERESPONSE']._serialized_end=560
-  _globals['_JOURNEY']._serialized_start=562
-  _globals['_JOURNEY']._serialized_end=675
-  _globals['_JOURNEYSUMMARY']._serialized_start=678
-  _globals['_JOURNEYSUMMARY']._serialized_end=834
-  _globals['_LEG']._serialized_start=836
-  _globals['_LEG']._serialized_end=963
-  _globals['_WALKLEG']._serialized_start=965
-  _globals['_WALKLEG']._serialized_end=1060
-  _globals['_TRIPLEG']._serialized_start=1063
-  _globals['_TRIPLEG']._serialized_end=1278
-  _globals['_TRANSFERLEG']._serialized_start=1281
-  _globals['_TRANSFERLEG']._serialized_end=1476
-  _globals['_STOP']._serialized_start=1478
-  _globals['_STOP']._serialized_end=1551
-  _globals['_COORDINATE']._serialized_start=1553
-  _globals['_COORDINATE']._serialized_end=1591
-  _globals['_ROUTINGSERVICE']._serialized_start=1594
-  _globals['_ROUTINGSERVICE']._serialized_end=1738
+  _globals['_ROUTEREQUEST']._serialized_end=409
+  _globals['_ROUTINGWEIGHTS']._serialized_start=411
+  _globals['_ROUTINGWEIGHTS']._serialized_end=487
+  _globals['_ROUTERESPONSE']._serialized_start=490
+  _globals['_ROUTERESPONSE']._serialized_end=658
+  _globals['_BATCHROUTEREQUEST']._serialized_start=660
+  _globals['_BATCHROUTEREQUEST']._serialized_end=720
+  _globals['_BATCHROUTEITEM']._serialized_start=722
+  _globals['_BATCHROUTEITEM']._serialized_end=831
+  _globals['_BATCHROUTERESPONSE']._serialized_start=833
+  _globals['_BATCHROUTERESPONSE']._serialized_end=895
+  _globals['_JOURNEY']._serialized_start=897
+  _globals['_JOURNEY']._serialized_end=1010
+  _globals['_JOURNEYSUMMARY']._serialized_start=1013
+  _globals['_JOURNEYSUMMARY']._serialized_end=1169
+  _globals['_LEG']._serialized_start=1171
+  _globals['_LEG']._serialized_end=1298
+  _globals['_WALKLEG']._serialized_start=1301
+  _globals['_WALKLEG']._serialized_end=1455
+  _globals['_TRIPLEG']._serialized_start=1458
+  _globals['_TRIPLEG']._serialized_end=1732
+  _globals['_TRANSFERLEG']._serialized_start=1735
+  _globals['_TRANSFERLEG']._serialized_end=1989
+  _globals['_STOP']._serialized_start=1991
+  _globals['_STOP']._serialized_end=2064
+  _globals['_COORDINATE']._serialized_start=2066
+  _globals['_COORDINATE']._serialized_end=2104
+  _globals['_ROUTINGSERVICE']._serialized_start=2208
+  _globals['_ROUTINGSERVICE']._serialized_end=2494
 # @@protoc_insertion_point(module_scope)
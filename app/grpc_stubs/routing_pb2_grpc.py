@@ -45,6 +45,16 @@ class RoutingServiceStub(object):
                 request_serializer=routing__pb2.RouteRequest.SerializeToString,
                 response_deserializer=routing__pb2.RouteResponse.FromString,
                 _registered_method=True)
+        self.FindRoutesBatch = channel.unary_unary(
+                '/routing.RoutingService/FindRoutesBatch',
+                request_serializer=routing__pb2.BatchRouteRequest.SerializeToString,
+                response_deserializer=routing__pb2.BatchRouteResponse.FromString,
+                _registered_method=True)
+        self.FindRouteStream = channel.unary_stream(
+                '/routing.RoutingService/FindRouteStream',
+                request_serializer=routing__pb2.RouteRequest.SerializeToString,
+                response_deserializer=routing__pb2.Journey.FromString,
+                _registered_method=True)
 
 
 class RoutingServiceServicer(object):
@@ -65,6 +75,20 @@ class RoutingServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def FindRoutesBatch(self, request, context):
+        """Find routes for many origin/destination pairs in one round trip
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def FindRouteStream(self, request, context):
+        """Same as FindRoute, but journeys are streamed one by one as they are ready
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_RoutingServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -78,6 +102,16 @@ def add_RoutingServiceServicer_to_server(servicer, server):
                     request_deserializer=routing__pb2.RouteRequest.FromString,
                     response_serializer=routing__pb2.RouteResponse.SerializeToString,
             ),
+            'FindRoutesBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.FindRoutesBatch,
+                    request_deserializer=routing__pb2.BatchRouteRequest.FromString,
+                    response_serializer=routing__pb2.BatchRouteResponse.SerializeToString,
+            ),
+            'FindRouteStream': grpc.unary_stream_rpc_method_handler(
+                    servicer.FindRouteStream,
+                    request_deserializer=routing__pb2.RouteRequest.FromString,
+                    response_serializer=routing__pb2.Journey.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'routing.RoutingService', rpc_method_handlers)
@@ -143,3 +177,57 @@ class RoutingService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def FindRoutesBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/routing.RoutingService/FindRoutesBatch',
+            routing__pb2.BatchRouteRequest.SerializeToString,
+            routing__pb2.BatchRouteResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def FindRouteStream(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/routing.RoutingService/FindRouteStream',
+            routing__pb2.RouteRequest.SerializeToString,
+            routing__pb2.Journey.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -0,0 +1,83 @@
+"""Normalization of Arabic place names, shared by Python and Postgres.
+
+Users type the same place many ways (أ/إ/ا, ة/ه, with or without "محطة" or
+"ش."); matching only works if both sides are folded the same way. The rules
+live here once: `normalize()` applies them in Python and `sql_expression()` /
+`sql_function_ddl()` render the same pipeline as SQL, so a normalized column
+built in Postgres agrees with the query strings built here.
+
+Pipeline:
+1. lower-case (Latin letters);
+2. character folding: alef variants أ إ آ ٱ -> ا, ى/ی -> ي, ة -> ه, ؤ -> و,
+   ئ -> ي, ک -> ك, Arabic-Indic/Persian digits -> 0-9;
+3. drop tatweel and diacritics (tashkeel, superscript alef);
+4. collapse whitespace and trim;
+5. drop one leading "محطة " / "شارع " / "ش. " / "ش " prefix.
+"""
+import re
+
+_FOLD = {
+    "أ": "ا",
+    "إ": "ا",
+    "آ": "ا",
+    "ٱ": "ا",
+    "ى": "ي",
+    "ی": "ي",
+    "ئ": "ي",
+    "ة": "ه",
+    "ؤ": "و",
+    "ک": "ك",
+}
+_FOLD.update({chr(0x0660 + i): str(i) for i in range(10)})  # ٠..٩
+_FOLD.update({chr(0x06F0 + i): str(i) for i in range(10)})  # ۰..۹
+
+# tatweel, fathatan..sukun, superscript alef
+_DROP = "ـ" + "".join(chr(c) for c in range(0x064B, 0x0653)) + "ٰ"
+
+# Written against the folded text (so "محطة" is already "محطه"). Only the
+# regex subset that behaves the same in Python and Postgres ARE is used.
+_PREFIX_RE = "^(محطه |شارع |ش\\. ?|ش )"
+_SPACE_RE = "\\s+"
+
+_TABLE = str.maketrans({**_FOLD, **{c: None for c in _DROP}})
+_prefix = re.compile(_PREFIX_RE)
+_space = re.compile(_SPACE_RE)
+
+
+def fold(text: str) -> str:
+    """Steps 1-4 only (no prefix stripping): for whole sentences rather than names."""
+    s = (text or "").lower().translate(_TABLE)
+    return _space.sub(" ", s).strip()
+
+
+def normalize(text: str) -> str:
+    return _prefix.sub("", fold(text), count=1).strip()
+
+
+def _sql_literal(s: str) -> str:
+    return "'" + s.replace("'", "''") + "'"
+
+
+def sql_translate_args() -> tuple:
+    """(from, to) strings for Postgres `translate()`; characters past the end
+    of `to` are deleted."""
+    return "".join(_FOLD) + _DROP, "".join(_FOLD.values())
+
+
+def sql_expression(column: str) -> str:
+    """SQL expression computing `normalize(column)` in Postgres."""
+    src, dst = sql_translate_args()
+    folded = f"lower({column})"
+    folded = f"translate({folded}, {_sql_literal(src)}, {_sql_literal(dst)})"
+    folded = f"btrim(regexp_replace({folded}, {_sql_literal(_SPACE_RE)}, ' ', 'g'))"
+    return f"btrim(regexp_replace({folded}, {_sql_literal(_PREFIX_RE)}, ''))"
+
+
+def sql_function_ddl(name: str = "norm_ar") -> str:
+    """`CREATE FUNCTION name(text)` wrapping `sql_expression` (IMMUTABLE, so it
+    can feed an index or a maintained column)."""
+    return (
+        f"CREATE OR REPLACE FUNCTION {name}(t text) RETURNS text "
+        f"LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE "
+        f"AS $$ SELECT {sql_expression('t')} $$;"
+    )
@@ -0,0 +1,232 @@
+"""Small in-process caching helpers shared by the service clients.
+
+`TTLCache` is a thread-safe LRU with per-entry expiry and hit/miss counters. It
+can sit in front of a `SqliteStore` so entries survive restarts: misses in memory
+fall through to SQLite, and writes go to both. `get_async`/`set_async` do the
+SQLite part in a worker thread, so event-loop code never blocks on disk I/O.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+class SqliteStore:
+    """Key/value table in a local SQLite file with absolute expiry times.
+
+    Values go through `dumps`/`loads` (JSON by default); pass identity functions
+    to store raw bytes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        table: str = "cache",
+        dumps: Callable[[Any], Any] = lambda v: json.dumps(v, ensure_ascii=False),
+        loads: Callable[[Any], Any] = json.loads,
+    ):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table!r}")
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.table = table
+        self._dumps = dumps
+        self._loads = loads
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value, expires_at REAL NOT NULL)"
+        )
+        self._writes = 0
+
+    def get(self, key: str) -> Tuple[Any, float]:
+        """Return `(value, expires_at)`, or `(_MISSING, 0)` when absent/expired."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            return _MISSING, 0.0
+        return self._loads(row[0]), row[1]
+
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        data = self._dumps(value)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, data, expires_at),
+            )
+            self._writes += 1
+            if self._writes % 500 == 0:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (time.time(),))
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class TTLCache:
+    """Thread-safe LRU cache with a default TTL and optional per-entry TTLs.
+
+    - `maxsize` bounds the number of entries (0 disables caching entirely).
+    - `max_weight`/`weigh` optionally bound the total size too, e.g.
+      `weigh=len` for bytes values.
+    - `store` (a `SqliteStore`) adds a persistent second level.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 300.0,
+        store: Optional[SqliteStore] = None,
+        max_weight: Optional[int] = None,
+        weigh: Optional[Callable[[Any], int]] = None,
+    ):
+        self.maxsize = int(maxsize)
+        self.ttl = float(ttl)
+        self.store = store
+        self.max_weight = max_weight
+        self._weigh = weigh or (lambda v: 1)
+        self._lock = threading.Lock()
+        # key -> (value, expires_at, weight)
+        self._data: "OrderedDict[Hashable, Tuple[Any, float, int]]" = OrderedDict()
+        self._weight = 0
+        self.hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        if not self.enabled:
+            return default
+        value = self._get_memory(key)
+        if value is _MISSING and self.store is not None:
+            value = self._get_store(key)
+        return self._counted(value, default)
+
+    async def get_async(self, key: Hashable, default: Any = None) -> Any:
+        """`get` for coroutines: memory inline, the store lookup in a thread."""
+        if not self.enabled:
+            return default
+        value = self._get_memory(key)
+        if value is _MISSING and self.store is not None:
+            value = await asyncio.to_thread(self._get_store, key)
+        return self._counted(value, default)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        if not self.enabled:
+            return
+        expires_at = self._set_memory(key, value, ttl)
+        if self.store is not None:
+            self.store.set(str(key), value, expires_at)
+
+    async def set_async(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """`set` for coroutines: memory inline, the store write in a thread."""
+        if not self.enabled:
+            return
+        expires_at = self._set_memory(key, value, ttl)
+        if self.store is not None:
+            await asyncio.to_thread(self.store.set, str(key), value, expires_at)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._remove(key)
+        if self.store is not None:
+            self.store.delete(str(key))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._weight = 0
+        if self.store is not None:
+            self.store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.store_hits + self.misses
+            return {
+                "hits": self.hits,
+                "store_hits": self.store_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.store_hits) / lookups if lookups else 0.0,
+                "size": len(self._data),
+                "weight": self._weight,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _get_memory(self, key: Hashable) -> Any:
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                self._remove(key)
+        return _MISSING
+
+    def _get_store(self, key: Hashable) -> Any:
+        value, expires_at = self.store.get(str(key))
+        if value is not _MISSING:
+            with self._lock:
+                self.store_hits += 1
+                self._insert(key, value, expires_at)
+        return value
+
+    def _counted(self, value: Any, default: Any) -> Any:
+        if value is _MISSING:
+            with self._lock:
+                self.misses += 1
+            return default
+        return value
+
+    def _set_memory(self, key: Hashable, value: Any, ttl: Optional[float]) -> float:
+        expires_at = time.time() + (self.ttl if ttl is None else float(ttl))
+        with self._lock:
+            self._insert(key, value, expires_at)
+        return expires_at
+
+    # -- internals (caller holds self._lock) --
+
+    def _insert(self, key: Hashable, value: Any, expires_at: float) -> None:
+        self._remove(key)
+        weight = int(self._weigh(value))
+        self._data[key] = (value, expires_at, weight)
+        self._weight += weight
+        while self._data and (
+            len(self._data) > self.maxsize
+            or (self.max_weight is not None and self._weight > self.max_weight and len(self._data) > 1)
+        ):
+            _, (_, _, w) = self._data.popitem(last=False)
+            self._weight -= w
+            self.evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._weight -= entry[2]
@@ -0,0 +1,242 @@
+"""Shared, thread-safe Postgres connection pools.
+
+Opening a psycopg2 connection costs a TCP + auth handshake; services should
+borrow one from a named pool instead:
+
+    with get_pool("geocoding", host=..., database=...).connection() as conn:
+        cur = conn.cursor()
+        ...
+
+Pool sizes come from DB_POOL_MIN (opened up front) / DB_POOL_MAX (the most
+open at once; returned connections stay open for reuse). Connections are in autocommit
+mode (the services only run reads), are validated with `SELECT 1` when they
+have sat idle for more than DB_POOL_HEALTHCHECK_S, and are discarded once
+closed (a lost connection), not on ordinary query errors.
+
+Hot queries can be declared once as `PreparedQuery` objects; `pool.execute()`
+then PREPAREs them the first time each pooled connection runs them and uses
+EXECUTE afterwards, so Postgres parses and plans them once per connection
+instead of on every call.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Sequence, Set
+
+import psycopg2
+from psycopg2 import InterfaceError, OperationalError
+from psycopg2 import errors as pg_errors
+from psycopg2 import pool as pg_pool
+
+logger = logging.getLogger(__name__)
+
+
+_PARAM_RE = re.compile(r"\$(\d+)")
+
+
+class PreparedQuery:
+    """A query written with $1, $2... placeholders and run as a prepared statement.
+
+    `arg_types` are the Postgres types of the parameters, e.g. ("text", "int").
+    With DB_PREPARE=0 the same query runs as plain SQL instead.
+    """
+
+    def __init__(self, name: str, sql: str, arg_types: Sequence[str] = ()):
+        self.name = name
+        self.sql = sql.strip().rstrip(";")
+        self.arg_types = tuple(arg_types)
+        types = f"({', '.join(self.arg_types)})" if self.arg_types else ""
+        self.prepare_sql = f"PREPARE {name}{types} AS {self.sql}"
+        self.execute_sql = f"EXECUTE {name}" + (f"({', '.join(['%s'] * len(self.arg_types))})" if self.arg_types else "")
+        # plain-SQL fallback: $n -> %s, with parameters repeated as referenced
+        self._plain_order = [int(n) - 1 for n in _PARAM_RE.findall(self.sql)]
+        self.plain_sql = _PARAM_RE.sub("%s", self.sql.replace("%", "%%"))
+
+    def plain_params(self, params: Sequence[Any]) -> tuple:
+        return tuple(params[i] for i in self._plain_order)
+
+
+class ConnectionPool:
+    """Blocking pool of psycopg2 connections.
+
+    At most `maxconn` connections are open at once; callers wait up to
+    `timeout` seconds for a free one. Returned connections stay open in an
+    idle list (psycopg2's own pool closes everything beyond `minconn`, which
+    under concurrency meant a reconnect, and lost prepared statements, on
+    almost every borrow).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        minconn: int = 1,
+        maxconn: int = 10,
+        timeout: float = 10.0,
+        healthcheck_after: float = 30.0,
+        **conn_kwargs: Any,
+    ):
+        self.name = name
+        self.minconn = max(0, int(minconn))
+        self.maxconn = max(1, int(maxconn), self.minconn)
+        self.timeout = timeout
+        self.healthcheck_after = healthcheck_after
+        self.conn_kwargs = conn_kwargs
+        self._idle: Deque[Any] = deque()
+        self._opened = False
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.maxconn)
+        self._last_used: Dict[int, float] = {}
+        self._prepared: Dict[int, Set[str]] = {}
+        self.use_prepared = os.environ.get("DB_PREPARE", "1") != "0"
+
+    def _connect(self):
+        return psycopg2.connect(**self.conn_kwargs)
+
+    def _open(self) -> None:
+        if self._opened:
+            return
+        with self._lock:
+            if self._opened:
+                return
+            # Called with a slot held, so at most maxconn - 1 others are out.
+            for _ in range(min(self.minconn, self.maxconn - 1)):
+                self._idle.append(self._connect())
+            self._opened = True
+        logger.info(
+            f"[DB POOL] {self.name}: opened ({self.minconn}-{self.maxconn} connections) "
+            f"to {self.conn_kwargs.get('host')}:{self.conn_kwargs.get('port')}/{self.conn_kwargs.get('database')}"
+        )
+
+    def _is_healthy(self, conn) -> bool:
+        if conn.closed:
+            return False
+        last_used = self._last_used.get(id(conn))
+        if last_used is None or time.monotonic() - last_used < self.healthcheck_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            return True
+        except (OperationalError, InterfaceError):
+            return False
+
+    def _checkout(self):
+        self._open()
+        # Most recently used first (warm, least likely to have timed out);
+        # stale idle connections are dropped, then a new one is opened.
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                conn = self._connect()
+                conn.autocommit = True
+                return conn
+            if self._is_healthy(conn):
+                if not conn.autocommit:
+                    conn.autocommit = True
+                return conn
+            self._discard(conn)
+
+    def _forget(self, conn) -> None:
+        self._last_used.pop(id(conn), None)
+        self._prepared.pop(id(conn), None)
+
+    def _discard(self, conn) -> None:
+        self._forget(conn)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Borrow a connection; it goes back to the pool (or is dropped if broken)."""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise pg_pool.PoolError(f"[DB POOL] {self.name}: timed out waiting for a connection")
+        conn = None
+        try:
+            conn = self._checkout()
+            yield conn
+        finally:
+            if conn is not None:
+                # Query errors (statement timeout, bad SQL) leave an autocommit
+                # connection usable, with its prepared statements; only a
+                # closed one is dropped.
+                if conn.closed:
+                    self._discard(conn)
+                else:
+                    self._last_used[id(conn)] = time.monotonic()
+                    with self._lock:
+                        self._idle.append(conn)
+            self._slots.release()
+
+    def execute(self, cur, query: PreparedQuery, params: Sequence[Any] = ()) -> None:
+        """Run `query` on `cur`, preparing it on this connection first if needed."""
+        if not self.use_prepared:
+            cur.execute(query.plain_sql, query.plain_params(params))
+            return
+        prepared = self._prepared.setdefault(id(cur.connection), set())
+        if query.name not in prepared:
+            try:
+                cur.execute(query.prepare_sql)
+            except pg_errors.DuplicatePreparedStatement:
+                pass
+            prepared.add(query.name)
+        try:
+            cur.execute(query.execute_sql, tuple(params))
+        except pg_errors.InvalidSqlStatementName:
+            # The connection was replaced behind our back (e.g. same id reused).
+            cur.execute(query.prepare_sql)
+            cur.execute(query.execute_sql, tuple(params))
+
+    def warmup(self) -> None:
+        """Open the pool now (raises if the database is unreachable)."""
+        with self.connection():
+            pass
+
+    def close(self) -> None:
+        """Close the idle connections; the pool reopens on next use."""
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._opened = False
+        for conn in idle:
+            self._discard(conn)
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name: str, **conn_kwargs: Any) -> ConnectionPool:
+    """Return the process-wide pool called `name`, creating it on first use.
+
+    `conn_kwargs` are passed to `psycopg2.connect` (only used on creation).
+    """
+    pool = _pools.get(name)
+    if pool is not None:
+        return pool
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = _pools[name] = ConnectionPool(
+                name,
+                minconn=int(os.environ.get("DB_POOL_MIN", "1")),
+                maxconn=int(os.environ.get("DB_POOL_MAX", "10")),
+                timeout=float(os.environ.get("DB_POOL_TIMEOUT_S", "10")),
+                healthcheck_after=float(os.environ.get("DB_POOL_HEALTHCHECK_S", "30")),
+                **conn_kwargs,
+            )
+        return pool
+
+
+def close_all() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
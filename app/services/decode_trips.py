@@ -1,23 +1,62 @@
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 import logging
 import os
+import re
+import sys
+import threading
 import time
-import psycopg2
-from psycopg2 import OperationalError
+import random
+from contextlib import contextmanager
+from psycopg2 import InterfaceError, OperationalError
 from dotenv import load_dotenv
 
+from app.services import gtfs_snapshot
+from app.services.db_pool import PreparedQuery, get_pool
+
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+
+
+class DatabaseUnavailable(OperationalError):
+    """Raised without touching the network while the connector backs off."""
+
+
+def _connection_lost(conn) -> bool:
+    """True when an error happened while connecting (no connection yet) or
+    left the connection closed; False for query-level errors."""
+    return conn is None or bool(conn.closed)
+
+
 class PostgresConnector:
+    """Process-wide access to the GTFS database (thread-safe singleton).
+
+    Connections come from the shared "gtfs" pool, which validates idle ones
+    and drops broken ones. On top of that:
+
+    - `read()` runs idempotent queries and transparently retries them on a
+      fresh connection when the server dropped the old one;
+    - only errors while connecting, or that left the connection closed,
+      count as connection failures; query errors (a statement timeout, a bad
+      query) propagate unchanged and are neither retried nor backed off on;
+    - after repeated connection failures, calls fail fast for an exponentially
+      growing, jittered delay (PG_RETRY_BASE_S .. PG_RETRY_MAX_S) instead of
+      blocking callers in sleep loops; the first call after the delay probes
+      the server again.
+    """
+
     _instance = None
-    _connection = None
+    _instance_lock = threading.Lock()
+    pool = None
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(PostgresConnector, cls).__new__(cls)
-            cls._instance._initialize()
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(PostgresConnector, cls).__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
         return cls._instance
 
     def _initialize(self):
@@ -35,86 +74,384 @@ class PostgresConnector:
                 f"Missing required environment variable: {e}. Check your shell environment or .env file."
             ) from e
 
-        self.connect()
+        self.retry_base_s = float(os.environ.get("PG_RETRY_BASE_S", "1"))
+        self.retry_max_s = float(os.environ.get("PG_RETRY_MAX_S", "60"))
+        self._state_lock = threading.Lock()
+        self._failures = 0
+        self._retry_at = 0.0
+
+        try:
+            self.connect()
+        except OperationalError:
+            pass  # logged; later calls retry on the backoff schedule
 
     def connect(self):
-        if self._connection is not None:
-            try:
-                self._connection.close()
-                self._connection = None
-            except OperationalError:
-                pass
+        """Open the shared connection pool (raises OperationalError if unreachable)."""
+        self.pool = get_pool(
+            "gtfs",
+            database=self.db_name,
+            user=self.db_user,
+            password=self.db_password,
+            host=self.db_host,
+            port=self.db_port,
+        )
+        with self.connection():
+            pass
+        logger.info(f"Database connected successfully to {self.db_host}:{self.db_port}/{self.db_name}")
 
-        max_retries = 5
-        retry_delay = 2  # seconds
-        for attempt in range(1, max_retries + 1):
-            try:
-                self._connection = psycopg2.connect(
-                    database=self.db_name,
-                    user=self.db_user,
-                    password=self.db_password,
-                    host=self.db_host,
-                    port=self.db_port,
-                )
-                logger.info(
-                    f"Database connected successfully to {self.db_host}:{self.db_port}/{self.db_name}"
-                )
+    def _check_backoff(self) -> None:
+        with self._state_lock:
+            wait = self._retry_at - time.monotonic()
+        if wait > 0:
+            raise DatabaseUnavailable(f"Database unavailable, next attempt in {wait:.1f}s")
+
+    def _record_failure(self, e: Exception) -> None:
+        with self._state_lock:
+            self._failures += 1
+            # A single dropped connection is retried right away; back off only
+            # once the server looks down.
+            if self._failures < 2:
                 return
-            except OperationalError as e:
-                if attempt < max_retries:
-                    logger.info(
-                        f"Connection attempt {attempt}/{max_retries} failed, retrying in {retry_delay}s..."
-                    )
-                    time.sleep(retry_delay)
-                else:
-                    logger.error(f"All {max_retries} connection attempts failed: {e}")
-                    self._connection = None
+            delay = min(self.retry_max_s, self.retry_base_s * 2 ** (self._failures - 2))
+            delay *= random.uniform(0.5, 1.0)
+            self._retry_at = time.monotonic() + delay
+        logger.warning(f"Database connection failed ({self._failures} in a row), retrying in {delay:.1f}s: {e}")
+
+    def _record_success(self) -> None:
+        if self._failures:
+            with self._state_lock:
+                if self._failures >= 2:
+                    logger.info(f"Database reconnected to {self.db_host}:{self.db_port}/{self.db_name}")
+                self._failures = 0
+                self._retry_at = 0.0
+
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection: `with self.db.connection() as conn: ...`
+
+        Fails fast with OperationalError while backing off after failures.
+        """
+        self._check_backoff()
+        conn = None
+        try:
+            with self.pool.connection() as conn:
+                yield conn
+        except DatabaseUnavailable:
+            raise
+        except (OperationalError, InterfaceError) as e:
+            if _connection_lost(conn):
+                self._record_failure(e)
+            else:
+                self._record_success()  # the server answered; the query failed
+            raise
+        self._record_success()
+
+    def read(self, query, params=None, retries: int = 1) -> list:
+        """Run an idempotent query (SQL string or PreparedQuery) and return all rows.
+
+        If the connection turns out to be dead, the pool discards it and the
+        query is retried (up to `retries` times) on a fresh one.
+        """
+        for attempt in range(retries + 1):
+            used = None
+            try:
+                with self.connection() as conn:
+                    used = conn
+                    with conn.cursor() as cur:
+                        if isinstance(query, PreparedQuery):
+                            self.pool.execute(cur, query, params or ())
+                        else:
+                            cur.execute(query, params)
+                        return cur.fetchall()
+            except DatabaseUnavailable:
+                raise
+            except (OperationalError, InterfaceError):
+                if attempt == retries or not _connection_lost(used):
                     raise
+                logger.info(f"Retrying read after a connection error ({attempt + 1}/{retries})")
+
+    def is_alive(self) -> bool:
+        """Liveness check (`SELECT 1`), without retries."""
+        try:
+            return self.read("SELECT 1", retries=0) == [(1,)]
+        except Exception:
+            return False
 
     def close(self):
-        if self._connection:
+        if self.pool is not None:
+            self.pool.close()
+            logger.info("Database connection pool closed.")
+
+
+# Frequency-expanded trips share an id and differ only by the start time suffix.
+_TIME_SUFFIX_RE = re.compile(r"-\d{1,2}:\d{2}:\d{2}$")
+
+
+def trip_key(gtfs_trip_id: str) -> str:
+    """gtfs_trip_id without its `-HH:MM:SS` suffix (all departures of a trip share a route)."""
+    return _TIME_SUFFIX_RE.sub("", gtfs_trip_id)
+
+
+class RouteNameIndex:
+    """In-memory trip -> route name map, keyed by `trip_key`.
+
+    Route names are interned, so the map is essentially one small string per
+    distinct trip. The feed is fingerprinted: row count, max id and the
+    updated/deleted tuple counter (pg_stat_user_tables) of `trip`, plus a hash
+    of every (route_id, name) in the small `route` table, so in-place renames
+    and delete+insert are seen too. A background check every `check_every_s`
+    reloads the map when the fingerprint changes, loading only the new trips
+    when the feed was only appended to, and does a full reload at least every
+    `full_every_s` regardless (statistics can be off or reset). Lookups never
+    wait on the database.
+
+    With a `snapshot_source` (e.g. `gtfs_snapshot.open_default`), lookups fall
+    back to the memory-mapped file it returns and the map only holds trips
+    added to the feed since that snapshot was exported. A re-exported file is
+    adopted as-is; if the source stops returning one (removed or too old), the
+    next check reloads everything from the database. A full reload drops the
+    snapshot for good.
+    """
+
+    _ROWS_SQL = """
+        SELECT t.gtfs_trip_id, r.name
+        FROM trip t
+        JOIN route r ON t.route_id = r.route_id
+    """
+    # Four bigints (the snapshot header's fingerprint slots); the route hash
+    # is the first 64 bits of an md5 over the whole table.
+    _FINGERPRINT_SQL = """
+        SELECT (SELECT count(*) FROM trip), (SELECT max(trip_id) FROM trip),
+               (SELECT n_tup_upd + n_tup_del FROM pg_stat_user_tables WHERE relid = 'trip'::regclass),
+               (SELECT ('x' || substr(md5(coalesce(string_agg(route_id || ':' || coalesce(name, ''), ',' ORDER BY route_id), '')), 1, 16))::bit(64)::bigint
+                FROM route)
+    """
+
+    def __init__(self, db: "PostgresConnector", check_every_s: float = 300.0, snapshot_source=None,
+                 full_every_s: float = 86400.0):
+        self.db = db
+        self.check_every_s = check_every_s
+        self.full_every_s = full_every_s
+        self._names: Dict[str, str] = {}
+        self._snapshot_source = snapshot_source
+        self._snapshot = None
+        self._fingerprint: Optional[Tuple] = None
+        self._full_at = 0.0
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+        snapshot = snapshot_source() if snapshot_source is not None else None
+        if snapshot is not None:
+            self._adopt(snapshot)
+
+    def _adopt(self, snapshot) -> None:
+        self._snapshot = snapshot
+        self._names = {}
+        self._fingerprint = snapshot.fingerprint
+        self._full_at = snapshot.created_at
+        self._checked_at = 0.0  # catch up with trips added since the export
+
+    def _current_snapshot(self):
+        """The snapshot to read through, following the source while snapshot-backed."""
+        snap = self._snapshot
+        if snap is None or self._snapshot_source is None:
+            return snap
+        current = self._snapshot_source()
+        if current is snap:
+            return snap
+        with self._lock:
+            if self._snapshot is snap:
+                if current is not None:
+                    self._adopt(current)
+                    logger.info(f"[ROUTE NAMES] Switched to snapshot {current.path} ({current.num_trips} trips)")
+                else:
+                    # Gone or stale: misses go to the database until the full reload.
+                    self._snapshot = None
+                    self._full_at = 0.0
+                    self._checked_at = 0.0
+        return self._snapshot
+
+    @property
+    def loaded(self) -> bool:
+        return self._fingerprint is not None
+
+    @property
+    def fingerprint(self) -> Optional[Tuple]:
+        return self._fingerprint
+
+    def __len__(self) -> int:
+        return len(self._names) + (self._snapshot.num_trips if self._snapshot is not None else 0)
+
+    def items(self) -> Iterable[Tuple[str, str]]:
+        """(trip_key, route_name) pairs held in memory (not those in the snapshot)."""
+        return self._names.items()
+
+    def _query(self, sql: str, params=None) -> list:
+        return self.db.read(sql, params)
+
+    def _build(self, rows, names: Dict[str, str]) -> Dict[str, str]:
+        for gtfs_trip_id, route_name in rows:
+            if route_name is not None:
+                names[trip_key(gtfs_trip_id)] = sys.intern(route_name)
+        return names
+
+    def refresh(self) -> None:
+        """Bring the map up to date with the feed (exceptions propagate)."""
+        start = time.time()
+        self._checked_at = time.monotonic()
+        fingerprint = tuple(self._query(self._FINGERPRINT_SQL)[0])
+        old = self._fingerprint
+        full_due = time.time() - self._full_at > self.full_every_s
+        if fingerprint == old and not full_due:
+            return
+
+        trips, max_trip, trip_changes, route_hash = fingerprint
+        if (
+            not full_due
+            and old is not None
+            and (trip_changes, route_hash) == old[2:]
+            and trip_changes is not None
+            and old[1] is not None
+            and (max_trip or 0) > old[1]
+        ):
+            # Only trips were added: load the new rows on top of a copy.
+            rows = self._query(self._ROWS_SQL + " WHERE t.trip_id > %s", (old[1],))
+            if old[0] + len(rows) == trips:
+                self._names = self._build(rows, dict(self._names))
+                self._fingerprint = fingerprint
+                logger.info(f"[ROUTE NAMES] +{len(rows)} trips in {time.time() - start:.2f}s ({len(self._names)} total)")
+                return
+
+        self._names = self._build(self._query(self._ROWS_SQL), {})
+        self._snapshot = None
+        self._fingerprint = fingerprint
+        self._full_at = time.time()
+        logger.info(f"[ROUTE NAMES] Loaded {len(self._names)} trips in {time.time() - start:.2f}s")
+
+    def refresh_async(self) -> None:
+        """Refresh in a background thread unless one is already running."""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def _run():
             try:
-                self._connection.close()
-                self._connection = None
-                logger.info("Database connection closed.")
-            except OperationalError as e:
-                logger.error(f"Error closing connection: {e}")
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"[ROUTE NAMES] Refresh failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=_run, name="route-names-refresh", daemon=True).start()
+
+    def lookup(self, gtfs_trip_ids: Iterable[str]) -> Tuple[Dict[str, str], List[str]]:
+        """(found names, ids not in the map); schedules a background check when due."""
+        snap = self._current_snapshot()
+        if time.monotonic() - self._checked_at > self.check_every_s:
+            self.refresh_async()
+        names = self._names
+        found, missing = {}, []
+        for tid in gtfs_trip_ids:
+            key = trip_key(tid)
+            name = names.get(key)
+            if name is None and snap is not None:
+                name = snap.route_name(key)
+            if name is None:
+                missing.append(tid)
+            else:
+                found[tid] = name
+        return found, missing
+
+
+_route_names: Optional[RouteNameIndex] = None
+_route_names_lock = threading.Lock()
+
+
+def get_route_name_index(db: "PostgresConnector") -> RouteNameIndex:
+    """Process-wide RouteNameIndex: backed by the GTFS_SNAPSHOT file when there
+    is one, else loaded synchronously on first use."""
+    global _route_names
+    if _route_names is None:
+        with _route_names_lock:
+            if _route_names is None:
+                index = RouteNameIndex(
+                    db,
+                    check_every_s=float(os.environ.get("TRIP_NAMES_CHECK_S", "300")),
+                    full_every_s=float(os.environ.get("TRIP_NAMES_FULL_REFRESH_S", "86400")),
+                    snapshot_source=gtfs_snapshot.open_default,
+                )
+                if not index.loaded:
+                    index.refresh()
+                _route_names = index
+    return _route_names
+
+
+# Hot per-request lookups, prepared once per pooled connection.
+_ROUTE_NAME_QUERY = PreparedQuery(
+    "trip_route_name",
+    """
+    SELECT r.name
+    FROM trip t
+    JOIN route r ON t.route_id = r.route_id
+    WHERE t.gtfs_trip_id = $1
+    LIMIT 1
+    """,
+    ("text",),
+)
+_ROUTE_NAMES_QUERY = PreparedQuery(
+    "trip_route_names",
+    """
+    SELECT DISTINCT ON (t.gtfs_trip_id) t.gtfs_trip_id, r.name
+    FROM trip t
+    JOIN route r ON t.route_id = r.route_id
+    WHERE t.gtfs_trip_id = ANY($1)
+    """,
+    ("text[]",),
+)
 
 
 class TripDecoder:
-    def __init__(self):
+    def __init__(self, preload: Optional[bool] = None):
         self.db = PostgresConnector()
+        # trip -> route names are static GTFS data: keep them in memory
+        # (TRIP_NAMES_PRELOAD=0 to always query the database).
+        if preload is None:
+            preload = os.environ.get("TRIP_NAMES_PRELOAD", "1") != "0"
+        self.preload = preload
+        self.route_names: Optional[RouteNameIndex] = None
+        self._index()
+
+    def _index(self) -> Optional[RouteNameIndex]:
+        # Retried on later calls if the database was down at startup
+        # (cheap: the connector fails fast while it backs off).
+        if self.route_names is None and self.preload:
+            try:
+                self.route_names = get_route_name_index(self.db)
+            except DatabaseUnavailable:
+                pass
+            except Exception as e:
+                logger.warning(f"Route name preload failed, querying per call: {e}")
+        return self.route_names
     
     def get_route_name_from_trip(self, gtfs_trip_id: str) -> Optional[str]:
         """
         ترجع اسم الراوت بناءً على gtfs_trip_id
         """
-        query = """
-            SELECT r.name
-            FROM trip t
-            JOIN route r ON t.route_id = r.route_id
-            WHERE t.gtfs_trip_id = %s
-            LIMIT 1
-        """
-        conn = self.db._connection
-        if conn is None:
-            self.db.connect()
-            conn = self.db._connection
-
-        cur = None
+        index = self._index()
+        if index is not None:
+            found, _ = index.lookup([gtfs_trip_id])
+            if found:
+                return found[gtfs_trip_id]
         try:
-            cur = conn.cursor()
-            cur.execute(query, (gtfs_trip_id,))
-            row = cur.fetchone()
-            if row:
-                return row[0]  # route_name
+            rows = self.db.read(_ROUTE_NAME_QUERY, (gtfs_trip_id,))
+            if rows:
+                return rows[0][0]  # route_name
             return None
         except Exception as e:
             print(f"Error fetching route_name for gtfs_trip_id={gtfs_trip_id}: {e}")
             return None
-        finally:
-            if cur:
-                cur.close()
 
 
     def filter_sort(self, route_response):
@@ -130,15 +467,40 @@ class TripDecoder:
         return journeys_top
 
 
+    def get_route_names(self, gtfs_trip_ids: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        اسم الراوت لكل gtfs_trip_id في query واحدة (ids المتكررة تتبعت مرة واحدة)
+        """
+        unique_ids = list(dict.fromkeys(tid for tid in gtfs_trip_ids if tid))
+        names: Dict[str, Optional[str]] = {}
+        index = self._index()
+        if index is not None:
+            found, unique_ids = index.lookup(unique_ids)
+            names.update(found)
+        if not unique_ids:
+            return names
+        try:
+            rows = self.db.read(_ROUTE_NAMES_QUERY, (unique_ids,))
+        except Exception as e:
+            print(f"Error fetching route_names for {len(unique_ids)} gtfs_trip_ids: {e}")
+            return names
+        names.update(dict.fromkeys(unique_ids))
+        names.update(rows)
+        return names
+
+    def decode_paths(self, paths: List[list]) -> List[list]:
+        """
+        زي decode_path لكذا path مرة واحدة: كل الـ trip ids بتتحل في round trip واحد
+        """
+        names = self.get_route_names(trip_id for path in paths for trip_id in path)
+        return [[names.get(trip_id) or "(خط غير معروف)" for trip_id in path] for path in paths]
+
     def decode_path(self, path: list) -> list:
         """
         تحول list من gtfs_trip_ids ل list من route_names جاهزة للمستخدم
         """
-        readable_path = []
-        for trip_id in path:
-            route_name = self.get_route_name_from_trip(trip_id)
-            readable_path.append(route_name or "(خط غير معروف)")
-        return readable_path
+        return self.decode_paths([path])[0]
+
 
 
 
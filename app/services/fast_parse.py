@@ -0,0 +1,96 @@
+"""Rule-based origin/destination extraction for template-shaped queries.
+
+Most queries look like "عايز اروح من سيدي جابر لمحطة مصر": a "من" marker for
+the origin and a destination marker (لـ / إلى / لحد / على ...). `fast_parse`
+finds every way such markers split the text, scores each side against the stop
+gazetteer (trailing filler like "ازاي" falls away because shorter spans match
+better), and returns the best split with a confidence in [0, 1]. `parse_node`
+only calls the LLM when the confidence is below FAST_PARSE_MIN_CONFIDENCE.
+"""
+import re
+from typing import List, Tuple
+
+# Diacritics/tatweel are dropped and punctuation becomes a space; letters are
+# kept as typed so the extracted names read like the user's text.
+_NOISE = re.compile(r"[ً-ْٰـ]")
+_PUNCT = re.compile(r"[^\w\s]|_")
+
+_ORIGIN = re.compile(r"(?:^|\s)من\s+")
+# Separate-word destination markers, with how strongly each implies "to".
+_DEST_WORDS = {
+    "الى": 1.0, "إلى": 1.0, "الي": 1.0, "إلي": 1.0, "لحد": 1.0, "لغاية": 1.0, "لغايه": 1.0,
+    "ل": 0.9, "لل": 0.9, "على": 0.8, "علي": 0.8, "عند": 0.7,
+}
+# "لمحطة مصر", "للمنشية": ل glued to the destination's first word; "لل" -> "ال".
+_GLUED_WEIGHT = 0.8
+
+
+def _clean(text: str) -> str:
+    text = _PUNCT.sub(" ", _NOISE.sub("", text or ""))
+    return " ".join(text.split())
+
+
+def _splits(words: List[str]) -> List[Tuple[List[str], List[str], float]]:
+    """(origin words, destination words, marker weight) for every marker position."""
+    out = []
+    for i in range(1, len(words)):
+        w = words[i]
+        if w in _DEST_WORDS and i + 1 < len(words):
+            out.append((words[:i], words[i + 1:], _DEST_WORDS[w]))
+        elif w.startswith("لل") and len(w) > 3:
+            out.append((words[:i], ["ال" + w[2:]] + words[i + 1:], _GLUED_WEIGHT))
+        elif w.startswith("ل") and len(w) > 2:
+            out.append((words[:i], [w[1:]] + words[i + 1:], _GLUED_WEIGHT))
+    return out
+
+
+def _best_span(words: List[str], score, from_start: bool) -> Tuple[str, float]:
+    """Highest-scoring run of words anchored at the start (or end) of `words`;
+    ties go to the longer run."""
+    best, best_score = " ".join(words), -1.0
+    for n in range(len(words), 0, -1):
+        span = " ".join(words[:n] if from_start else words[-n:])
+        s = score(span)
+        if s > best_score + 1e-9:
+            best, best_score = span, s
+    return best, max(best_score, 0.0)
+
+
+def fast_parse(text: str, gazetteer=None) -> dict:
+    """Parse `text` into {"origin", "destination", "confidence"}.
+
+    `gazetteer` is a StopGazetteer (default: the geocoding one). When its
+    snapshot isn't loaded there is nothing to check the names against, so
+    the confidence stays at or below 0.5.
+    """
+    if gazetteer is None:
+        from app.services.geocoding_serv import stop_gazetteer
+
+        gazetteer = stop_gazetteer()
+
+    empty = {"origin": None, "destination": None, "confidence": 0.0}
+    cleaned = _clean(text)
+    m = _ORIGIN.search(cleaned)
+    if not m:
+        return empty
+    words = cleaned[m.end():].split()
+
+    cache = {}
+
+    def score(span: str) -> float:
+        if span not in cache:
+            hits = gazetteer.search(span, limit=1)
+            cache[span] = None if hits is None else (hits[0]["score"] if hits else 0.0)
+        return cache[span] if cache[span] is not None else 0.5
+
+    best = empty
+    for origin_words, dest_words, weight in _splits(words):
+        # the origin ends at the marker; the destination may carry trailing filler
+        origin, s_o = _best_span(origin_words, score, from_start=False)
+        dest, s_d = _best_span(dest_words, score, from_start=True)
+        if not origin or not dest or origin == dest:
+            continue
+        confidence = weight * min(s_o, s_d)
+        if confidence > best["confidence"]:
+            best = {"origin": origin, "destination": dest, "confidence": round(confidence, 3)}
+    return best
@@ -35,6 +35,81 @@ SYSTEM_PROMPT = """
 - لو مفيش رحلات قول: "مع الأسف مفيش رحلات مناسبة دلوقتي."
 """
 
+def _format_payload(journeys: list, origin: str, dest: str) -> dict:
+    clean_journeys = []
+    for j in journeys:
+        summary = j.get("summary") or {}
+        legs = j.get("legs") or []
+
+        clean_legs = []
+        for leg in legs:
+            t = leg.get("type")
+            if t == "walk":
+                clean_legs.append(
+                    {
+                        "type": "walk",
+                        "distance_meters": int(leg.get("distance_meters", 0)),
+                        "duration_minutes": int(leg.get("duration_minutes", 0)),
+                    }
+                )
+            elif t == "trip":
+                clean_legs.append(
+                    {
+                        "type": "trip",
+                        "mode": leg.get("mode", ""),
+                        "route_short_name": leg.get("route_short_name", ""),
+                        "headsign": leg.get("headsign", ""),
+                        "from": (leg.get("from") or {}).get("name", ""),
+                        "to": (leg.get("to") or {}).get("name", ""),
+                        "duration_minutes": int(leg.get("duration_minutes", 0)),
+                        "fare": float(leg.get("fare", 0.0)),
+                    }
+                )
+            elif t == "transfer":
+                clean_legs.append(
+                    {
+                        "type": "transfer",
+                        "from_trip_name": leg.get("from_trip_name", ""),
+                        "to_trip_name": leg.get("to_trip_name", ""),
+                        "walking_distance_meters": int(leg.get("walking_distance_meters", 0)),
+                        "duration_minutes": int(leg.get("duration_minutes", 0)),
+                    }
+                )
+
+        clean_journeys.append(
+            {
+                "id": j.get("id"),
+                "summary": {
+                    "total_time_minutes": int(summary.get("total_time_minutes", 0)),
+                    "walking_distance_meters": int(summary.get("walking_distance_meters", 0)),
+                    "transfers": int(summary.get("transfers", 0)),
+                    "cost": float(summary.get("cost", 0.0)),
+                    "modes": summary.get("modes", []),
+                },
+                "legs": clean_legs,
+                "text_summary": j.get("text_summary", ""),
+            }
+        )
+
+    return {
+        "origin": origin,
+        "destination": dest,
+        "journeys": clean_journeys
+    }
+
+
+def _generate_kwargs(payload: dict) -> dict:
+    return dict(
+        model="gemini-2.5-flash",
+        contents=[json.dumps(payload, ensure_ascii=False)],
+        config=types.GenerateContentConfig(
+            system_instruction=SYSTEM_PROMPT,
+            temperature= 0,
+            response_mime_type="text/plain"
+        )
+    )
+
+
 def format_server_journeys_for_user_llm(
     journeys: list,
     origin: str,
@@ -44,76 +119,29 @@ def format_server_journeys_for_user_llm(
         if not journeys:
             return "مع الأسف مفيش رحلات مناسبة دلوقتي."
 
-        clean_journeys = []
-        for j in journeys:
-            summary = j.get("summary") or {}
-            legs = j.get("legs") or []
-
-            clean_legs = []
-            for leg in legs:
-                t = leg.get("type")
-                if t == "walk":
-                    clean_legs.append(
-                        {
-                            "type": "walk",
-                            "distance_meters": int(leg.get("distance_meters", 0)),
-                            "duration_minutes": int(leg.get("duration_minutes", 0)),
-                        }
-                    )
-                elif t == "trip":
-                    clean_legs.append(
-                        {
-                            "type": "trip",
-                            "mode": leg.get("mode", ""),
-                            "route_short_name": leg.get("route_short_name", ""),
-                            "headsign": leg.get("headsign", ""),
-                            "from": (leg.get("from") or {}).get("name", ""),
-                            "to": (leg.get("to") or {}).get("name", ""),
-                            "duration_minutes": int(leg.get("duration_minutes", 0)),
-                            "fare": float(leg.get("fare", 0.0)),
-                        }
-                    )
-                elif t == "transfer":
-                    clean_legs.append(
-                        {
-                            "type": "transfer",
-                            "from_trip_name": leg.get("from_trip_name", ""),
-                            "to_trip_name": leg.get("to_trip_name", ""),
-                            "walking_distance_meters": int(leg.get("walking_distance_meters", 0)),
-                            "duration_minutes": int(leg.get("duration_minutes", 0)),
-                        }
-                    )
-
-            clean_journeys.append(
-                {
-                    "id": j.get("id"),
-                    "summary": {
-                        "total_time_minutes": int(summary.get("total_time_minutes", 0)),
-                        "walking_distance_meters": int(summary.get("walking_distance_meters", 0)),
-                        "transfers": int(summary.get("transfers", 0)),
-                        "cost": float(summary.get("cost", 0.0)),
-                        "modes": summary.get("modes", []),
-                    },
-                    "legs": clean_legs,
-                    "text_summary": j.get("text_summary", ""),
-                }
-            )
-
-        payload = {
-            "origin": origin,
-            "destination": dest,
-            "journeys": clean_journeys
-        }
-
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=[json.dumps(payload, ensure_ascii=False)],
-            config=types.GenerateContentConfig(
-                system_instruction=SYSTEM_PROMPT,
-                temperature= 0,
-                response_mime_type="text/plain"
-            )
-        )
+        payload = _format_payload(journeys, origin, dest)
+        response = client.models.generate_content(**_generate_kwargs(payload))
+
+        return response.text
+
+    except Exception as e:
+        print(f"[LLM FORMAT ERROR] {e}")
+        return "حصلت مشكلة واحنا بنجهز الرحلات، جرب تاني."
+
+
+async def format_server_journeys_for_user_llm_async(
+    journeys: list,
+    origin: str,
+    dest: str
+) -> str:
+    """Same as format_server_journeys_for_user_llm, on the async client
+    (`client.aio`): waiting on Gemini doesn't hold a thread."""
+    try:
+        if not journeys:
+            return "مع الأسف مفيش رحلات مناسبة دلوقتي."
+
+        payload = _format_payload(journeys, origin, dest)
+        response = await client.aio.models.generate_content(**_generate_kwargs(payload))
 
         return response.text
 
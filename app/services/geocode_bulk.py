@@ -0,0 +1,100 @@
+"""Bulk geocoding of place-name lists (query logs, eval sets) from the command line.
+
+Reads names from CSV or JSONL (file or stdin), geocodes them with
+`geocode_many` in chunks, and streams the results out as they are resolved.
+Each output row is the input row plus `lat`, `lon` and `error`.
+
+    python -m app.services.geocode_bulk names.csv -o geocoded.csv --column name
+    cat names.jsonl | python -m app.services.geocode_bulk --format jsonl > out.jsonl
+"""
+import argparse
+import csv
+import json
+import sys
+from itertools import islice
+from typing import Iterator
+
+from app.services.geocoding_serv import geocode_many
+
+
+def _read_rows(fh, fmt: str, column: str) -> Iterator[dict]:
+    if fmt == "csv":
+        for row in csv.DictReader(fh):
+            yield row
+    else:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            row = json.loads(line)
+            yield row if isinstance(row, dict) else {column: row}
+
+
+def _chunks(it, size: int):
+    it = iter(it)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _detect_format(path: str | None, fmt: str | None) -> str:
+    if fmt:
+        return fmt
+    if path and path.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    return "csv"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Geocode a list of place names")
+    parser.add_argument("input", nargs="?", help="CSV/JSONL file (default: stdin)")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="input format (default: from extension, else csv)")
+    parser.add_argument("--output-format", choices=["csv", "jsonl"], help="default: same as input")
+    parser.add_argument("--column", default="name", help="field holding the place name")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--quiet", action="store_true", help="no progress on stderr")
+    args = parser.parse_args(argv)
+
+    in_fmt = _detect_format(args.input, args.format)
+    out_fmt = args.output_format or _detect_format(args.output, None if args.output else in_fmt)
+
+    fin = open(args.input, encoding="utf-8", newline="") if args.input else sys.stdin
+    fout = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    writer = None
+    done_total = 0
+
+    def progress(done, total):
+        if not args.quiet:
+            print(f"\r[GEOCODE BULK] {done_total} rows written, chunk: {done}/{total} names resolved", end="", file=sys.stderr, flush=True)
+
+    try:
+        for chunk in _chunks(_read_rows(fin, in_fmt, args.column), max(1, args.chunk_size)):
+            names = [str(row.get(args.column) or "") for row in chunk]
+            results = geocode_many(names, progress=progress)
+            for row, name in zip(chunk, names):
+                res = results[name]
+                row = dict(row, lat=res.get("lat"), lon=res.get("lon"), error=res.get("error"))
+                if out_fmt == "jsonl":
+                    fout.write(json.dumps(row, ensure_ascii=False) + "\n")
+                else:
+                    if writer is None:
+                        writer = csv.DictWriter(fout, fieldnames=list(row), extrasaction="ignore")
+                        writer.writeheader()
+                    writer.writerow(row)
+            fout.flush()
+            done_total += len(chunk)
+    finally:
+        if not args.quiet:
+            print(f"\n[GEOCODE BULK] {done_total} rows", file=sys.stderr)
+        if fin is not sys.stdin:
+            fin.close()
+        if fout is not sys.stdout:
+            fout.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,99 +1,471 @@
-from geopy.geocoders import Nominatim
-from geopy.extra.rate_limiter import RateLimiter
+import logging
+import math
 import os
-import psycopg2
+import threading
+
+from app.services import arabic_norm, gtfs_snapshot, nominatim_client
+from app.services.cache import SqliteStore, TTLCache
+from app.services.db_pool import PreparedQuery, get_pool
+from app.services.stop_gazetteer import StopGazetteer
+
+logger = logging.getLogger(__name__)
+
 
 def _normalize_ar(text: str) -> str:
-    # Minimal normalization for common Arabic spelling variants.
-    # Example: ي vs ى
-    return (text or "").replace("ى", "ي").strip()
+    # Alef/yaa/taa-marbuta variants, diacritics, digits, "محطة"/"ش." prefixes;
+    # see arabic_norm (the same rules are used on the SQL side).
+    return arabic_norm.normalize(text)
 
 
-def _search_stop_db(query: str) -> dict | None:
-    """Return best stop match from Postgres using pg_trgm similarity.
+def _db_pool():
+    return get_pool(
+        "geocoding",
+        host=os.environ.get("DB_HOST", "localhost"),
+        port=int(os.environ.get("DB_PORT", "5432")),
+        database=os.environ.get("DB_NAME", "transport_db"),
+        user=os.environ.get("DB_USER", "postgres"),
+        password=os.environ.get("DB_PASSWORD", "postgres"),
+    )
 
-    Returns: {lat, lon, score, stop_id, name} or None
-    """    
 
-    host = os.environ.get("DB_HOST", "localhost")
-    port = int(os.environ.get("DB_PORT", "5432"))
-    db = os.environ.get("DB_NAME", "transport_db")
-    user = os.environ.get("DB_USER", "postgres")
-    pwd = os.environ.get("DB_PASSWORD", "postgres")
+_name_norm_lock = threading.Lock()
+_name_norm_column: bool | None = None
 
-    q_norm = _normalize_ar(query)
-    if not q_norm:
-        return None
 
-    threshold = float(os.environ.get("STOP_SIM_THRESHOLD", "0.22"))
+def _stop_name_sql() -> str:
+    """SQL for a stop's normalized name.
 
-    try:
-        conn = psycopg2.connect(host=host, port=port, database=db, user=user, password=pwd)
-    except Exception:
-        return None
+    The indexed `stop.name_norm` column when migrate_stop_names has been run
+    (checked once), else the same normalization computed per row.
+    """
+    global _name_norm_column
+    if _name_norm_column is None:
+        with _name_norm_lock:
+            if _name_norm_column is None:
+                with _db_pool().connection() as conn:
+                    with conn.cursor() as cur:
+                        cur.execute(
+                            "SELECT 1 FROM information_schema.columns "
+                            "WHERE table_name = 'stop' AND column_name = 'name_norm';"
+                        )
+                        _name_norm_column = cur.fetchone() is not None
+    return "name_norm" if _name_norm_column else arabic_norm.sql_expression("name")
 
-    try:
-        cur = conn.cursor()
-        # Apply simple normalization in SQL too so ي/ى variants compare well.
-        sql = (
+
+_stop_search_queries: dict = {}
+
+
+def _stop_search_query() -> PreparedQuery:
+    """The hot stop search as a prepared statement (one per name_norm variant)."""
+    name_norm = _stop_name_sql()
+    variant = "col" if name_norm == "name_norm" else "expr"
+    query = _stop_search_queries.get(variant)
+    if query is None:
+        # Compare normalized names on both sides (indexed column if present).
+        query = _stop_search_queries[variant] = PreparedQuery(
+            f"geocode_stop_search_{variant}",
             "SELECT stop_id, name, ST_X(geom_4326) AS lon, ST_Y(geom_4326) AS lat, "
-            "       similarity(translate(name,'ى','ي'), %s) AS score "
+            f"       similarity({name_norm}, $1) AS score "
             "FROM stop "
-            "WHERE translate(name,'ى','ي') % %s "
+            f"WHERE {name_norm} % $1 "
             "ORDER BY score DESC, name ASC "
-            "LIMIT 1;"
+            "LIMIT $2",
+            ("text", "int"),
         )
-        cur.execute(sql, (q_norm, q_norm))
-        row = cur.fetchone()
-        if not row:
-            return None
-        stop_id, name, lon, lat, score = row
+    return query
+
+
+def _search_stops_db(query: str, limit: int = 1) -> list:
+    """Return the best `limit` stop matches from Postgres using pg_trgm similarity.
+
+    Returns: [{lat, lon, score, stop_id, name}, ...] best first. Database
+    errors propagate, so callers can tell "no stop matched" from "no answer".
+    """    
+
+    q_norm = _normalize_ar(query)
+    if not q_norm:
+        return []
+
+    threshold = float(os.environ.get("STOP_SIM_THRESHOLD", "0.22"))
+
+    sql = _stop_search_query()
+    pool = _db_pool()
+    with pool.connection() as conn:
+        cur = conn.cursor()
+        pool.execute(cur, sql, (q_norm, limit))
+        rows = cur.fetchall()
+        cur.close()
+
+    out = []
+    for stop_id, name, lon, lat, score in rows:
         if score is None or float(score) < threshold:
-            return None
-        return {
-            "stop_id": int(stop_id),
-            "name": str(name),
-            "lon": float(lon),
-            "lat": float(lat),
-            "score": float(score),
-        }
-    except Exception:
-        return None
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
+            break
+        out.append(
+            {
+                "stop_id": int(stop_id),
+                "name": str(name),
+                "lon": float(lon),
+                "lat": float(lat),
+                "score": float(score),
+            }
+        )
+    return out
+
+
+def _load_stops() -> list:
+    # The shared GTFS_SNAPSHOT file (mmap, no DB round trip) when there is one;
+    # open_default() picks up a re-export and returns None once it is too old.
+    snapshot = gtfs_snapshot.open_default()
+    if snapshot is not None:
+        return list(snapshot.stops())
+    return load_stops_db()
+
+
+def load_stops_db() -> list:
+    """Every stop as (stop_id, name, lon, lat), read from the `stop` table
+    (never from the snapshot; used to export one)."""
+    with _db_pool().connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT stop_id, name, ST_X(geom_4326) AS lon, ST_Y(geom_4326) AS lat FROM stop;")
+            return [(int(r[0]), str(r[1]), float(r[2]), float(r[3])) for r in cur.fetchall()]
+
+
+_gazetteer = StopGazetteer(
+    loader=_load_stops,
+    normalize=_normalize_ar,
+    max_age_s=float(os.environ.get("STOP_GAZETTEER_REFRESH_S", "3600")),
+)
+
+
+def stop_gazetteer() -> StopGazetteer:
+    """The process-wide in-memory stop index behind `stop_candidates`
+    (loaded from GTFS_SNAPSHOT or the stop table, refreshed in the background)."""
+    return _gazetteer
+
+
+def stop_candidates(query: str, k: int | None = None) -> list:
+    """Top-k stop matches by name similarity, best first: in-memory gazetteer
+    when its snapshot is fresh, else Postgres (database errors propagate)."""
+    k = k or int(os.environ.get("GEOCODE_CANDIDATES", "5"))
+    if os.environ.get("STOP_GAZETTEER", "1") != "0":
+        hits = _gazetteer.search(
+            query,
+            limit=k,
+            min_score=float(os.environ.get("STOP_SIM_THRESHOLD", "0.22")),
+            # the SQL path filters with `%`, i.e. pg_trgm.similarity_threshold
+            trgm_threshold=float(os.environ.get("STOP_TRGM_THRESHOLD", "0.3")),
+        )
+        if hits is not None:
+            return hits
+    return _search_stops_db(query, limit=k)
+
+
+# Alexandria city centre (Raml station), the prior when nothing better is known.
+CITY_CENTRE = {"lat": 31.2001, "lon": 29.9187}
+
+
+def _distance_km(a: dict, b: dict) -> float:
+    # Equirectangular approximation; plenty for distances within a city.
+    lat = math.radians((a["lat"] + b["lat"]) / 2)
+    dx = math.radians(b["lon"] - a["lon"]) * math.cos(lat)
+    dy = math.radians(b["lat"] - a["lat"])
+    return 6371.0 * math.hypot(dx, dy)
+
+
+def rank_candidates(candidates: list, anchor: dict | None = None) -> list:
+    """Re-rank stop candidates by text score minus a distance penalty.
 
+    The penalty grows linearly to GEOCODE_SPATIAL_WEIGHT (default 0.1) at
+    GEOCODE_SPATIAL_CAP_KM (default 20 km) from `anchor` — the other endpoint
+    when it is already resolved, else the city centre — so it only decides
+    between candidates whose names match about equally well (e.g. same-named
+    stops in different districts). Adds `dist_km` and `rank_score` to each.
+    """
+    anchor = anchor or CITY_CENTRE
+    weight = float(os.environ.get("GEOCODE_SPATIAL_WEIGHT", "0.1"))
+    cap_km = float(os.environ.get("GEOCODE_SPATIAL_CAP_KM", "20"))
+    ranked = []
+    for c in candidates:
+        dist = _distance_km(c, anchor)
+        ranked.append(dict(c, dist_km=dist, rank_score=c["score"] - weight * min(dist, cap_km) / cap_km))
+    ranked.sort(key=lambda c: -c["rank_score"])
+    return ranked
+
+
+def _geocode_cache_from_env() -> TTLCache:
+    db_path = os.environ.get("GEOCODE_CACHE_DB", "")
+    return TTLCache(
+        maxsize=int(os.environ.get("GEOCODE_CACHE_SIZE", "4096")),
+        ttl=float(os.environ.get("GEOCODE_CACHE_TTL_S", str(7 * 24 * 3600))),
+        store=SqliteStore(db_path, table="geocode_cache") if db_path else None,
+    )
+
+
+_geocode_cache = _geocode_cache_from_env()
+
+_stats_lock = threading.Lock()
+_stats = {"cache_hits": 0, "negative_cache_hits": 0, "db_hits": 0, "nominatim_hits": 0, "not_found": 0, "db_errors": 0, "bulk_db_errors": 0}
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def _cache_key(address: str) -> str:
+    # Same place name modulo ى/ي, case and spacing -> same entry.
+    return " ".join(_normalize_ar(address).lower().split())
+
+
+def geocode_stats() -> dict:
+    """Where geocode_address answers came from, plus the cache's own counters."""
+    with _stats_lock:
+        out = dict(_stats)
+    out["cache"] = _geocode_cache.stats()
+    return out
 
 
+def _candidates_entry(hits: list) -> dict:
+    """The geocode cache entry for stop matches (kept unranked)."""
+    return {"candidates": [{f: h[f] for f in ("stop_id", "name", "lat", "lon", "score")} for h in hits]}
 
 
-def geocode_address(address: str) -> dict:
-    """Geocode an address to latitude/longitude.
+def geocode_candidates(address: str, priority: int = nominatim_client.INTERACTIVE) -> dict:
+    """Like geocode_address, but keeps every matching stop.
 
-    1) Try Postgres `stop` table with pg_trgm similarity (best effort).
-    2) Fallback to Nominatim with Alexandria bias and 1s RateLimiter.
+    Returns {"candidates": [stop, ...]} for stop matches (not yet ranked),
+    {"lat", "lon"} for a Nominatim hit, or {"error": ...}. This is what the
+    geocode cache holds, so an ambiguous name can be resolved differently
+    depending on the other endpoint; see `resolve_candidates`.
+
+    0) Answer from the geocode cache: found places are kept for
+       GEOCODE_CACHE_TTL_S, "Location not found" for GEOCODE_NEGATIVE_TTL_S
+       (optionally persisted to SQLite via GEOCODE_CACHE_DB).
+    1) Try the `stop` table with pg_trgm similarity, top GEOCODE_CANDIDATES
+       (in-memory snapshot, or Postgres while the snapshot is loading/stale).
+    2) Fallback to Nominatim with Alexandria bias, through the shared client
+       (process-wide 1 req/s limit; `priority` orders queued lookups). If the
+       stop lookup failed (database down) the answer is not cached, so the
+       name is looked up again once the database is back.
     """
 
+    key = _cache_key(address)
+    cached = _geocode_cache.get(key)
+    if cached is not None:
+        _count("negative_cache_hits" if "error" in cached else "cache_hits")
+        return dict(cached)
+
     # 1) DB stops lookup
-    db_hit = _search_stop_db(address)
-    if db_hit:
-        return {"lat": db_hit["lat"], "lon": db_hit["lon"]}
+    try:
+        hits = stop_candidates(address)
+    except Exception as e:
+        _count("db_errors")
+        logger.warning(f"[GEOCODE] Stop lookup failed for {address!r}, trying Nominatim uncached: {e}")
+        return _geocode_nominatim(address, key, priority, cache=False)
+    if hits:
+        _count("db_hits")
+        result = _candidates_entry(hits)
+        _geocode_cache.set(key, result)
+        return dict(result)
 
     # 2) Nominatim fallback (single query, Alexandria bias)
-    geolocator = Nominatim(user_agent="alex_transit_agent")
-    geocode = RateLimiter(geolocator.geocode, min_delay_seconds=1.0)
+    return _geocode_nominatim(address, key, priority)
+
+
+def resolve_candidates(result: dict, anchor: dict | None = None) -> dict:
+    """Turn a geocode_candidates result into {"lat", "lon"} (or the error),
+    picking among stop candidates with `rank_candidates(..., anchor)`."""
+    if "candidates" not in result:
+        return dict(result)
+    best = rank_candidates(result["candidates"], anchor)[0]
+    return {"lat": best["lat"], "lon": best["lon"]}
+
+
+def resolve_pair(origin: dict, destination: dict) -> tuple:
+    """Resolve two geocode_candidates results, each anchored on the other.
+
+    A fixed point (Nominatim hit) anchors the other side directly; when both
+    are stop candidate lists, the destination's city-centre pick anchors the
+    origin, whose pick then anchors the destination.
+    """
+    o = None if "candidates" in origin else dict(origin)
+    d = None if "candidates" in destination else dict(destination)
+    if o is None and d is None:
+        o = resolve_candidates(origin, resolve_candidates(destination))
+    if o is None:
+        o = resolve_candidates(origin, d if "error" not in d else None)
+    if d is None:
+        d = resolve_candidates(destination, o if "error" not in o else None)
+    return o, d
+
+
+def geocode_address(address: str, priority: int = nominatim_client.INTERACTIVE, near: dict | None = None) -> dict:
+    """Geocode an address to latitude/longitude ({"lat", "lon"} or {"error"}).
+
+    See geocode_candidates for the lookup order. An ambiguous stop name is
+    resolved towards `near` ({"lat", "lon"}), else towards the city centre.
+    """
+    return resolve_candidates(geocode_candidates(address, priority), near)
+
+
+def _geocode_nominatim(address: str, key: str, priority: int, cache: bool = True) -> dict:
+    # cache=False when the stop lookup errored: a stop name that Nominatim
+    # misses (or places elsewhere) must not stick once the database is back.
     query = address.strip()
     if ("Alexandria" not in query) and ("الإسكندرية" not in query):
         query = f"{query}, Alexandria, Egypt"
 
     try:
-        location = geocode(query, exactly_one=True, country_codes="eg", addressdetails=False, timeout=10)
+        location = nominatim_client.geocode(query, priority=priority, timeout=10)
     except Exception:
-        location = None
+        # A network error isn't remembered as "not found".
+        return {"error": "Location not found"}
 
     if location:
-        return {"lat": float(location.latitude), "lon": float(location.longitude)}
+        _count("nominatim_hits")
+        result = {"lat": float(location.latitude), "lon": float(location.longitude)}
+        if cache:
+            _geocode_cache.set(key, result)
+        return dict(result)
     else:
-        return {"error": "Location not found"}
+        _count("not_found")
+        result = {"error": "Location not found"}
+        if cache:
+            _geocode_cache.set(key, result, ttl=float(os.environ.get("GEOCODE_NEGATIVE_TTL_S", "21600")))
+        return dict(result)
+
+
+def _search_stops_db_many(queries: list, k: int | None = None) -> dict:
+    """Top-k stops per query in one round trip: {query: [{lat, lon, score, stop_id, name}, ...]}.
+
+    Same scoring, threshold and k (GEOCODE_CANDIDATES) as `stop_candidates`;
+    queries without a match are left out. Raises on database errors.
+    """
+    k = k or int(os.environ.get("GEOCODE_CANDIDATES", "5"))
+    threshold = float(os.environ.get("STOP_SIM_THRESHOLD", "0.22"))
+    name_norm = _stop_name_sql()
+    sql = (
+        "SELECT q.query, s.stop_id, s.name, ST_X(s.geom_4326) AS lon, ST_Y(s.geom_4326) AS lat, s.score "
+        "FROM unnest(%s::text[]) AS q(query) "
+        "CROSS JOIN LATERAL ( "
+        f"    SELECT stop_id, name, geom_4326, similarity({name_norm}, q.query) AS score "
+        "    FROM stop "
+        f"    WHERE {name_norm} %% q.query "
+        "    ORDER BY score DESC, name ASC "
+        "    LIMIT %s "
+        ") AS s "
+        "ORDER BY q.query, s.score DESC, s.name ASC;"
+    )
+    with _db_pool().connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(sql, (list(queries), k))
+            rows = cur.fetchall()
+
+    out = {}
+    for query, stop_id, name, lon, lat, score in rows:
+        if score is None or float(score) < threshold:
+            continue
+        out.setdefault(query, []).append(
+            {
+                "stop_id": int(stop_id),
+                "name": str(name),
+                "lon": float(lon),
+                "lat": float(lat),
+                "score": float(score),
+            }
+        )
+    return out
+
+
+def geocode_many(names, progress=None) -> dict:
+    """Geocode many place names at once: {name: result like geocode_address}.
+
+    Names are deduplicated (by cache key), answered from the geocode cache,
+    then from the stops in a single set-based query (or the in-memory
+    gazetteer), and only the leftovers go to Nominatim one by one at BATCH
+    priority, so interactive lookups keep precedence over the shared rate
+    limit. `progress(done, total)` is called as unique names get resolved.
+    """
+    names = list(names)
+    by_key: dict = {}
+    for name in names:
+        by_key.setdefault(_cache_key(name), name)
+    total = len(by_key)
+    results: dict = {}
+
+    def _report():
+        if progress is not None:
+            progress(len(results), total)
+
+    pending = {}
+    for key, name in by_key.items():
+        if not key:
+            results[key] = {"error": "Location not found"}
+            continue
+        cached = _geocode_cache.get(key)
+        if cached is not None:
+            _count("negative_cache_hits" if "error" in cached else "cache_hits")
+            results[key] = resolve_candidates(cached)
+        else:
+            pending[key] = name
+    _report()
+
+    # 1) stops: in-memory gazetteer when fresh, else one query for all names
+    hits = {}
+    stop_errors = set()  # keys whose stop lookup failed: answer, but don't cache
+    if pending:
+        use_gazetteer = os.environ.get("STOP_GAZETTEER", "1") != "0"
+        if use_gazetteer and not _gazetteer.is_fresh():
+            _gazetteer.refresh_async()
+            use_gazetteer = False
+        if use_gazetteer:
+            for key, name in pending.items():
+                try:
+                    cands = stop_candidates(name)
+                except Exception as e:
+                    # the snapshot went stale mid-batch and the database is down
+                    _count("db_errors")
+                    logger.warning(f"[GEOCODE BULK] Stop lookup failed for {name!r}: {e}")
+                    stop_errors.add(key)
+                    continue
+                if cands:
+                    hits[key] = cands
+        else:
+            by_query = {}
+            for key, name in pending.items():
+                by_query.setdefault(_normalize_ar(name), []).append(key)
+            try:
+                for query, cands in _search_stops_db_many(list(by_query)).items():
+                    for key in by_query[query]:
+                        hits[key] = cands
+            except Exception:
+                # Don't let every name silently fall through to Nominatim
+                # (~1 req/s): say so, and retry name by name first.
+                _count("bulk_db_errors")
+                logger.warning(f"[GEOCODE BULK] Set-based stop query failed for {len(by_query)} names, retrying one by one", exc_info=True)
+                for key, name in pending.items():
+                    try:
+                        cands = _search_stops_db(name, limit=int(os.environ.get("GEOCODE_CANDIDATES", "5")))
+                    except Exception as e:
+                        _count("db_errors")
+                        logger.warning(f"[GEOCODE BULK] Stop lookup failed for {name!r}: {e}")
+                        stop_errors.add(key)
+                        continue
+                    if cands:
+                        hits[key] = cands
+    for key, cands in hits.items():
+        _count("db_hits")
+        # Cached exactly like geocode_candidates, so later interactive lookups
+        # still pick among same-named stops by the other endpoint.
+        entry = _candidates_entry(cands)
+        _geocode_cache.set(key, entry)
+        results[key] = resolve_candidates(entry)
+        del pending[key]
+    _report()
+
+    # 2) leftovers through the shared, rate-limited Nominatim client
+    for key, name in pending.items():
+        results[key] = _geocode_nominatim(name, key, nominatim_client.BATCH, cache=key not in stop_errors)
+        _report()
+
+    return {name: dict(results[_cache_key(name)]) for name in names}
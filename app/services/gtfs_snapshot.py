@@ -0,0 +1,305 @@
+"""Versioned binary snapshot of the GTFS lookup tables, read through mmap.
+
+The stop list (geocoding) and the trip -> route name map (trip decoding) are
+static between feed updates. Exporting them once to a file lets every worker
+process map the same file read-only: the OS keeps one copy in the page cache,
+and opening it costs no database round trip.
+
+Layout (little-endian, every section 8-byte aligned):
+
+    header   magic b"GTFSSNAP", u32 format version, u32 reserved,
+             f64 created_at, 4 x i64 feed fingerprint (-1 = NULL),
+             6 x u64 section offsets/lengths (strings, stops, trips)
+    strings  u32 count, u32 offsets[count + 1], utf-8 blob
+    stops    u32 count, i64 stop_id[n], u32 name[n], f64 lon[n], f64 lat[n]
+             (sorted by stop_id)
+    trips    u32 count, u32 key[n], u32 route_name[n]
+             (sorted by the utf-8 bytes of key; keys are `trip_key` values)
+
+Strings are stored once and referenced by index.
+
+    python -m app.services.gtfs_snapshot export gtfs.snap   # DB_* and PG_* env
+    python -m app.services.gtfs_snapshot info gtfs.snap
+
+Services pick it up from GTFS_SNAPSHOT=/path/to/gtfs.snap. A re-exported file
+is picked up on the next `open_default()` call, and a file older than
+GTFS_SNAPSHOT_MAX_AGE_S (default 7 days, 0 = no limit) is ignored so callers
+fall back to the database.
+"""
+import argparse
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+MAGIC = b"GTFSSNAP"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<8sII d 4q 6Q")
+
+StopRow = Tuple[int, str, float, float]
+
+logger = logging.getLogger(__name__)
+
+
+def _pad(buf: bytearray) -> None:
+    buf.extend(b"\0" * (-len(buf) % 8))
+
+
+class _Strings:
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+
+    def add(self, s: str) -> int:
+        i = self.index.get(s)
+        if i is None:
+            i = self.index[s] = len(self.index)
+        return i
+
+    def encode(self) -> bytes:
+        blobs = [s.encode("utf-8") for s in self.index]
+        offsets = [0]
+        for b in blobs:
+            offsets.append(offsets[-1] + len(b))
+        return struct.pack(f"<I{len(offsets)}I", len(blobs), *offsets) + b"".join(blobs)
+
+
+def write_snapshot(
+    path: str,
+    stops: Iterable[StopRow],
+    trips: Iterable[Tuple[str, str]],
+    fingerprint: Optional[Tuple] = None,
+) -> None:
+    """Write `stops` (stop_id, name, lon, lat) and `trips` (trip_key, route_name).
+
+    The file is written next to `path` and renamed into place, so readers that
+    still map the old file keep a consistent view.
+    """
+    strings = _Strings()
+
+    stops = sorted(stops, key=lambda r: r[0])
+    n = len(stops)
+    stops_sec = bytearray(struct.pack("<I", n))
+    _pad(stops_sec)
+    stops_sec += struct.pack(f"<{n}q", *(int(r[0]) for r in stops))
+    stops_sec += struct.pack(f"<{n}I", *(strings.add(str(r[1])) for r in stops))
+    _pad(stops_sec)
+    stops_sec += struct.pack(f"<{n}d", *(float(r[2]) for r in stops))
+    stops_sec += struct.pack(f"<{n}d", *(float(r[3]) for r in stops))
+
+    by_key = dict(trips)
+    keys = sorted(by_key, key=lambda k: k.encode("utf-8"))
+    n = len(keys)
+    trips_sec = bytearray(struct.pack("<I", n))
+    trips_sec += struct.pack(f"<{n}I", *(strings.add(k) for k in keys))
+    trips_sec += struct.pack(f"<{n}I", *(strings.add(by_key[k]) for k in keys))
+
+    strings_sec = bytearray(strings.encode())
+
+    fp = [(-1 if v is None else int(v)) for v in (tuple(fingerprint or ()) + (None,) * 4)[:4]]
+    body = bytearray()
+    sections = []
+    offset = _HEADER.size + (-_HEADER.size % 8)
+    for sec in (strings_sec, stops_sec, trips_sec):
+        _pad(sec)
+        sections += [offset + len(body), len(sec)]
+        body += sec
+
+    header = bytearray(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, time.time(), *fp, *sections))
+    _pad(header)
+
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(body)
+    os.replace(tmp, path)
+
+
+class GtfsSnapshot:
+    """Read-only, memory-mapped view of a snapshot file.
+
+    Arrays are `memoryview.cast` views straight into the mapping: nothing is
+    copied up front, and pages are shared with every process mapping the file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._mm)
+        magic, version, _, created_at, *rest = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a GTFS snapshot")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path}: snapshot format {version}, expected {FORMAT_VERSION}")
+        self.version = version
+        self.created_at = created_at
+        self.fingerprint = tuple(None if v == -1 else v for v in rest[:4])
+        str_off, _, stop_off, _, trip_off, _ = rest[4:]
+
+        (n,) = struct.unpack_from("<I", buf, str_off)
+        self._str_offsets = buf[str_off + 4:str_off + 4 + 4 * (n + 1)].cast("I")
+        self._str_blob = str_off + 4 + 4 * (n + 1)
+
+        (n,) = struct.unpack_from("<I", buf, stop_off)
+        pos = stop_off + 8
+        self._stop_ids = buf[pos:pos + 8 * n].cast("q")
+        pos += 8 * n
+        self._stop_names = buf[pos:pos + 4 * n].cast("I")
+        pos += 4 * n
+        pos += -pos % 8
+        self._stop_lon = buf[pos:pos + 8 * n].cast("d")
+        pos += 8 * n
+        self._stop_lat = buf[pos:pos + 8 * n].cast("d")
+
+        (n,) = struct.unpack_from("<I", buf, trip_off)
+        pos = trip_off + 4
+        self._trip_keys = buf[pos:pos + 4 * n].cast("I")
+        self._trip_routes = buf[pos + 4 * n:pos + 8 * n].cast("I")
+        self._buf = buf
+
+    def _bytes(self, i: int) -> bytes:
+        return self._buf[self._str_blob + self._str_offsets[i]:self._str_blob + self._str_offsets[i + 1]].tobytes()
+
+    def string(self, i: int) -> str:
+        return self._bytes(i).decode("utf-8")
+
+    @property
+    def num_stops(self) -> int:
+        return len(self._stop_ids)
+
+    @property
+    def num_trips(self) -> int:
+        return len(self._trip_keys)
+
+    def stops(self) -> Iterator[StopRow]:
+        for i in range(len(self._stop_ids)):
+            yield (self._stop_ids[i], self.string(self._stop_names[i]), self._stop_lon[i], self._stop_lat[i])
+
+    def route_name(self, key: str) -> Optional[str]:
+        """Route name for a trip_key (binary search over the sorted keys)."""
+        target = key.encode("utf-8")
+        keys = self._trip_keys
+        lo, hi = 0, len(keys)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._bytes(keys[mid]) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(keys) and self._bytes(keys[lo]) == target:
+            return self.string(self._trip_routes[lo])
+        return None
+
+    def close(self) -> None:
+        for view in (self._str_offsets, self._stop_ids, self._stop_names, self._stop_lon,
+                     self._stop_lat, self._trip_keys, self._trip_routes, self._buf):
+            view.release()
+        self._mm.close()
+
+
+# Replaced snapshots stay mapped for this long so callers still reading one
+# (a lookup, a stop list being copied) never see it closed under them.
+_RETIRE_GRACE_S = 60.0
+_STAT_EVERY_S = 1.0
+
+_lock = threading.Lock()
+_snapshot: Optional[GtfsSnapshot] = None
+_snapshot_stat: Optional[Tuple] = None
+_checked_at = 0.0
+_skipped_stat: Optional[Tuple] = None
+_retired: List[Tuple[GtfsSnapshot, float]] = []
+
+
+def _retire(snap: GtfsSnapshot) -> None:
+    _retired.append((snap, time.monotonic()))
+
+
+def _close_retired() -> None:
+    now = time.monotonic()
+    keep = []
+    for snap, at in _retired:
+        if now - at < _RETIRE_GRACE_S:
+            keep.append((snap, at))
+            continue
+        try:
+            snap.close()
+        except BufferError:
+            # still exported somewhere; the mapping goes when its last view does
+            pass
+    _retired[:] = keep
+
+
+def open_default() -> Optional[GtfsSnapshot]:
+    """The snapshot named by GTFS_SNAPSHOT, or None.
+
+    The file is stat'ed (at most once a second) and reopened when its inode or
+    mtime changes; the old mapping is closed after a grace period. A file that
+    can't be read (corrupt, other format version) or is older than
+    GTFS_SNAPSHOT_MAX_AGE_S is treated as absent.
+    """
+    global _snapshot, _snapshot_stat, _checked_at, _skipped_stat
+    path = os.environ.get("GTFS_SNAPSHOT", "")
+    with _lock:
+        now = time.monotonic()
+        if now - _checked_at >= _STAT_EVERY_S or _snapshot_stat is None or _snapshot_stat[0] != path:
+            _checked_at = now
+            _close_retired()
+            try:
+                st = os.stat(path) if path else None
+            except OSError:
+                st = None
+            stat = (path, st.st_ino, st.st_mtime_ns) if st is not None else (path, None, None)
+            if stat != _snapshot_stat:
+                fresh = None
+                if st is not None:
+                    try:
+                        fresh = GtfsSnapshot(path)
+                    except (OSError, ValueError, struct.error) as e:
+                        # truncated/corrupt/other-version file: recorded under
+                        # this stat, so it's logged once and retried on change
+                        logger.warning(f"[SNAPSHOT] Can't open {path}, using the database instead: {e}")
+                if _snapshot is not None:
+                    _retire(_snapshot)
+                _snapshot, _snapshot_stat = fresh, stat
+
+        max_age = float(os.environ.get("GTFS_SNAPSHOT_MAX_AGE_S", str(7 * 24 * 3600)))
+        if _snapshot is not None and max_age > 0 and time.time() - _snapshot.created_at > max_age:
+            if _skipped_stat != _snapshot_stat:
+                _skipped_stat = _snapshot_stat
+                logger.warning(f"[SNAPSHOT] {path} is older than {max_age:.0f}s, using the database instead")
+            return None
+        return _snapshot
+
+
+def export(path: str) -> None:
+    """Export stops (DB_* env) and trip route names (PG_* env) to `path`."""
+    from app.services.decode_trips import PostgresConnector, RouteNameIndex
+    from app.services.geocoding_serv import load_stops_db
+
+    stops = load_stops_db()
+    index = RouteNameIndex(PostgresConnector())
+    index.refresh()
+    write_snapshot(path, stops, index.items(), fingerprint=index.fingerprint)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="GTFS lookup snapshot")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("export", help="write a snapshot from the database").add_argument("path")
+    sub.add_parser("info", help="describe a snapshot").add_argument("path")
+    args = parser.parse_args()
+
+    if args.cmd == "export":
+        start = time.time()
+        export(args.path)
+        print(f"Wrote {args.path} ({os.path.getsize(args.path)} bytes) in {time.time() - start:.1f}s")
+    else:
+        snap = GtfsSnapshot(args.path)
+        print(
+            f"{args.path}: format {snap.version}, created {time.ctime(snap.created_at)}, "
+            f"feed {snap.fingerprint}, {snap.num_stops} stops, {snap.num_trips} trips"
+        )
@@ -0,0 +1,215 @@
+"""Lazy, read-only dict views over routing protobuf messages.
+
+`find_route(..., lazy=True)` returns `JourneyView`s instead of plain dicts. A view
+exposes exactly the keys of the eager dict shape (`journey["summary"]`,
+`leg.get("type")`, ...) but only builds a value when it is read, and never copies
+path geometry unless asked to. Packed and polyline paths (see
+`RouteRequest.path_encoding`) are decoded transparently. Use
+`LegView.path_array()` for a packed NumPy array, and `to_dict()` (or
+`materialize()` for containers holding views) when something has to serialize
+the result. `to_dict()` builds plain dicts straight from the field builders;
+it is also the eager (`lazy=False`) conversion used by routing_client.
+"""
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Tuple
+
+import numpy as np
+
+from app.services import polyline
+
+
+def _coord_dict(c) -> Dict[str, float]:
+    return {"lon": float(c.lon), "lat": float(c.lat)}
+
+
+def _stop_dict(stop) -> Dict[str, Any]:
+    return {
+        "stop_id": int(stop.stop_id),
+        "name": str(stop.name),
+        "coord": _coord_dict(stop.coord),
+    }
+
+
+def _path_dicts(leg_msg) -> list:
+    """Leg geometry as `{"lon","lat"}` dicts, whichever encoding the server used."""
+    if leg_msg.path_polyline:
+        # the vectorized decoder + tolist() is faster than polyline.decode()'s loop
+        return [{"lon": lon, "lat": lat} for lon, lat in polyline.decode_array(leg_msg.path_polyline).tolist()]
+    if leg_msg.path_lon:
+        return [{"lon": lon, "lat": lat} for lon, lat in zip(leg_msg.path_lon, leg_msg.path_lat)]
+    return [{"lon": float(p.lon), "lat": float(p.lat)} for p in leg_msg.path]
+
+
+def _path_array(leg_msg) -> np.ndarray:
+    if leg_msg.path_polyline:
+        return polyline.decode_array(leg_msg.path_polyline)
+    if leg_msg.path_lon:
+        out = np.empty((len(leg_msg.path_lon), 2), dtype=np.float64)
+        out[:, 0] = leg_msg.path_lon
+        out[:, 1] = leg_msg.path_lat
+        return out
+    path = leg_msg.path
+    n = len(path)
+    flat = np.fromiter((v for p in path for v in (p.lon, p.lat)), dtype=np.float64, count=2 * n)
+    return flat.reshape(n, 2)
+
+
+class _MessageView(Mapping):
+    """Mapping over a protobuf message whose values are computed on first access."""
+
+    __slots__ = ("_msg", "_cache")
+
+    # key -> function(message) -> value; filled in by subclasses
+    _FIELDS: Dict[str, Callable[[Any], Any]] = {}
+
+    def __init__(self, msg):
+        self._msg = msg
+        self._cache: Dict[str, Any] = {}
+
+    def _fields(self) -> Dict[str, Callable[[Any], Any]]:
+        return self._FIELDS
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        build = self._fields()[key]  # KeyError for unknown keys, like a dict
+        value = self._cache[key] = build(self._msg)
+        return value
+
+    def __iter__(self):
+        return iter(self._fields())
+
+    def __len__(self) -> int:
+        return len(self._fields())
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Every builder returns plain values; subclasses whose builders return
+        # views override this.
+        msg = self._msg
+        return {key: build(msg) for key, build in self._fields().items()}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+# Leg builders take the oneof sub-message (walk/trip/transfer), not the Leg.
+_WALK_FIELDS = {
+    "type": lambda wl: "walk",
+    "distance_meters": lambda wl: int(wl.distance_meters),
+    "duration_minutes": lambda wl: int(wl.duration_minutes),
+    "path": _path_dicts,
+}
+
+_TRIP_FIELDS = {
+    "type": lambda tl: "trip",
+    "trip_id": lambda tl: str(tl.trip_id),
+    "mode": lambda tl: str(tl.mode),
+    "route_short_name": lambda tl: str(tl.route_short_name),
+    "headsign": lambda tl: str(tl.headsign),
+    "fare": lambda tl: float(tl.fare),
+    "duration_minutes": lambda tl: int(tl.duration_minutes),
+    # "from" is a Python keyword, so the generated attribute is only reachable via getattr
+    "from": lambda tl: _stop_dict(getattr(tl, "from")),
+    "to": lambda tl: _stop_dict(tl.to),
+    "path": _path_dicts,
+}
+
+_TRANSFER_FIELDS = {
+    "type": lambda tr: "transfer",
+    "from_trip_id": lambda tr: str(tr.from_trip_id),
+    "to_trip_id": lambda tr: str(tr.to_trip_id),
+    "from_trip_name": lambda tr: str(tr.from_trip_name),
+    "to_trip_name": lambda tr: str(tr.to_trip_name),
+    "walking_distance_meters": lambda tr: int(tr.walking_distance_meters),
+    "duration_minutes": lambda tr: int(tr.duration_minutes),
+    "path": _path_dicts,
+}
+
+_LEG_FIELDS = {"walk": _WALK_FIELDS, "trip": _TRIP_FIELDS, "transfer": _TRANSFER_FIELDS}
+
+
+class LegView(_MessageView):
+    """View over a `routing.Leg` (oneof walk/trip/transfer)."""
+
+    __slots__ = ("_kind",)
+
+    def __init__(self, msg):
+        self._kind = msg.WhichOneof("leg_type")
+        # Views hold the set oneof member; the builders read it directly.
+        super().__init__(getattr(msg, self._kind) if self._kind else msg)
+
+    def _fields(self) -> Dict[str, Callable[[Any], Any]]:
+        return _LEG_FIELDS.get(self._kind, {})
+
+    def path_array(self) -> np.ndarray:
+        """Leg geometry as a `(n, 2)` float64 array of `[lon, lat]` rows."""
+        if self._kind is None:
+            return np.empty((0, 2), dtype=np.float64)
+        return _path_array(self._msg)
+
+
+def leg_to_dict(leg_msg) -> Dict[str, Any]:
+    """Plain dict for a `routing.Leg` (same keys as `LegView`)."""
+    kind = leg_msg.WhichOneof("leg_type")
+    if kind is None:
+        return {}
+    sub = getattr(leg_msg, kind)
+    return {key: build(sub) for key, build in _LEG_FIELDS[kind].items()}
+
+
+def _summary_dict(j) -> Dict[str, Any]:
+    s = j.summary
+    return {
+        "total_time_minutes": int(s.total_time_minutes),
+        "total_distance_meters": int(s.total_distance_meters),
+        "walking_distance_meters": int(s.walking_distance_meters),
+        "transfers": int(s.transfers),
+        "cost": float(s.cost),
+        "modes": list(s.modes),
+    }
+
+
+class JourneyView(_MessageView):
+    """View over a `routing.Journey`; `legs` is a list of `LegView`s."""
+
+    __slots__ = ()
+
+    _FIELDS = {
+        "id": lambda j: int(j.id),
+        "text_summary": lambda j: str(j.text_summary),
+        "summary": _summary_dict,
+        "legs": lambda j: [LegView(leg) for leg in j.legs],
+    }
+
+    def path_arrays(self) -> Tuple[np.ndarray, ...]:
+        """One `(n, 2)` `[lon, lat]` array per leg."""
+        return tuple(leg.path_array() for leg in self["legs"])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return journey_to_dict(self._msg)
+
+
+def journey_to_dict(j) -> Dict[str, Any]:
+    """Plain dict for a `routing.Journey` (the eager `find_route` shape)."""
+    return {
+        "id": int(j.id),
+        "text_summary": str(j.text_summary),
+        "summary": _summary_dict(j),
+        "legs": [leg_to_dict(leg) for leg in j.legs],
+    }
+
+
+def materialize(value: Any) -> Any:
+    """Turn views inside arbitrary containers (e.g. a whole graph state) into
+    plain dicts/lists, for serialization. Not used on the routing hot path."""
+    if isinstance(value, _MessageView):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {k: materialize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [materialize(v) for v in value]
+    if isinstance(value, Mapping):
+        return {k: materialize(v) for k, v in value.items()}
+    return value
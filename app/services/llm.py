@@ -1,5 +1,3 @@
-
-
 SYSTEM_PROMPT = """
 You are an information extraction system.
 
@@ -19,13 +17,19 @@ JSON schema:
 }
 """
 
+import hashlib
 import json
 import os
+import threading
+import unicodedata
 from dotenv import load_dotenv
 from google.genai import Client
 from google.genai import types
 from typing import Optional
 
+from app.services import arabic_norm
+from app.services.cache import SqliteStore, TTLCache
+
 load_dotenv()
 
 client = Client(
@@ -35,26 +39,110 @@ client = Client(
 print("LLM Client initialized.")
 print(client)
 
-def llm_parse(user_input: str) -> dict:
-    try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=[user_input],
-            config=types.GenerateContentConfig(
-                system_instruction=SYSTEM_PROMPT,
-                response_mime_type="application/json",
-                temperature=0.0
-            )
+MODEL = "gemini-2.5-flash"
+
+# temperature=0.0, so the same query always parses the same way: cache it.
+# Persisted entries are tied to the model + prompt they came from.
+_PARSE_VERSION = hashlib.sha1(f"{MODEL}\n{SYSTEM_PROMPT}".encode("utf-8")).hexdigest()[:8]
+
+
+def _parse_cache_from_env() -> TTLCache:
+    db_path = os.environ.get("LLM_CACHE_DB", "")
+    return TTLCache(
+        maxsize=int(os.environ.get("LLM_CACHE_SIZE", "2048")),
+        ttl=float(os.environ.get("LLM_CACHE_TTL_S", str(7 * 24 * 3600))),
+        store=SqliteStore(db_path, table="llm_parse_cache") if db_path else None,
+    )
+
+
+_parse_cache = _parse_cache_from_env()
+
+_stats_lock = threading.Lock()
+_stats = {"llm_calls": 0, "llm_errors": 0}
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def _parse_cache_key(user_input: str) -> str:
+    # Arabic-folded (alef/yaa/taa-marbuta variants, diacritics, tatweel,
+    # digits), punctuation dropped, whitespace collapsed.
+    text = arabic_norm.fold(user_input)
+    text = "".join(" " if unicodedata.category(ch).startswith("P") else ch for ch in text)
+    return f"{_PARSE_VERSION}:{' '.join(text.split())}"
+
+
+def llm_parse_stats() -> dict:
+    """LLM calls/errors plus the parse cache's hit/miss counters."""
+    with _stats_lock:
+        out = dict(_stats)
+    out["cache"] = _parse_cache.stats()
+    return out
+
+
+def _generate_kwargs(user_input: str) -> dict:
+    return dict(
+        model=MODEL,
+        contents=[user_input],
+        config=types.GenerateContentConfig(
+            system_instruction=SYSTEM_PROMPT,
+            response_mime_type="application/json",
+            temperature=0.0
         )
+    )
+
+
+def _parse_response(text: str) -> dict:
+    parsed = json.loads(text)
+
+    return {
+        "origin": parsed.get("origin"),
+        "destination": parsed.get("destination")
+    }
 
-        parsed = json.loads(response.text)
 
+def llm_parse(user_input: str) -> dict:
+    key = _parse_cache_key(user_input)
+    cached = _parse_cache.get(key)
+    if cached is not None:
+        return dict(cached)
+
+    try:
+        _count("llm_calls")
+        response = client.models.generate_content(**_generate_kwargs(user_input))
+        result = _parse_response(response.text)
+        # Only real answers are cached; errors are retried next time.
+        _parse_cache.set(key, result)
+        return dict(result)
+
+    except Exception as e:
+        _count("llm_errors")
+        print(f"[LLM PARSE ERROR] {e}")
         return {
-            "origin": parsed.get("origin"),
-            "destination": parsed.get("destination")
+            "origin": None,
+            "destination": None
         }
 
+
+async def llm_parse_async(user_input: str) -> dict:
+    """llm_parse on the async client (`client.aio`); shares the parse cache
+    (with LLM_CACHE_DB, its SQLite reads/writes run in a worker thread)."""
+    key = _parse_cache_key(user_input)
+    cached = await _parse_cache.get_async(key)
+    if cached is not None:
+        return dict(cached)
+
+    try:
+        _count("llm_calls")
+        response = await client.aio.models.generate_content(**_generate_kwargs(user_input))
+        result = _parse_response(response.text)
+        await _parse_cache.set_async(key, result)
+        return dict(result)
+
     except Exception as e:
+        _count("llm_errors")
         print(f"[LLM PARSE ERROR] {e}")
         return {
             "origin": None,
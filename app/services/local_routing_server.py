@@ -0,0 +1,264 @@
+"""Offline stand-in for the routing gRPC server.
+
+Implements the RoutingService from `app/grpc/routing.proto` with deterministic,
+synthetic journeys built from straight-line geometry, so the client (unary,
+batch, streaming) can be exercised and benchmarked without the real GTFS router.
+
+Run standalone:
+    python -m app.services.local_routing_server --addr localhost:50051
+"""
+import argparse
+import math
+import time
+from concurrent import futures
+from typing import List, Optional, Tuple
+
+import grpc
+
+from app.services import polyline
+from app.services.routing_client import routing_pb2, routing_pb2_grpc
+
+
+_WALK_M_PER_MIN = 80.0
+_RIDE_M_PER_MIN = 250.0
+_FARE_PER_TRIP = 5.0
+_PATH_STEP_M = 25.0
+
+
+def _haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    r = 6371000.0
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * r * math.asin(math.sqrt(a))
+
+
+def _lerp(a: Tuple[float, float], b: Tuple[float, float], t: float) -> Tuple[float, float]:
+    return (a[0] + (b[0] - a[0]) * t, a[1] + (b[1] - a[1]) * t)
+
+
+def _line(a: Tuple[float, float], b: Tuple[float, float]) -> Tuple[List[Tuple[float, float]], float]:
+    """Points every ~25 m from a to b (both (lon, lat)) and the length in meters."""
+    dist = _haversine_m(a[1], a[0], b[1], b[0])
+    n = max(1, int(dist // _PATH_STEP_M))
+    return [_lerp(a, b, i / n) for i in range(n + 1)], dist
+
+
+def _fill_path(msg, points: List[Tuple[float, float]]) -> None:
+    for lon, lat in points:
+        msg.path.add(lon=lon, lat=lat)
+
+
+def _strip_paths(resp) -> None:
+    for j in resp.journeys:
+        for leg in j.legs:
+            kind = leg.WhichOneof("leg_type")
+            if kind is not None:
+                del getattr(leg, kind).path[:]
+
+
+def _encode_paths(resp, encoding: int) -> None:
+    """Re-encode every leg's `path` in place as requested by `RouteRequest.path_encoding`."""
+    if encoding == routing_pb2.PATH_ENCODING_COORDINATES:
+        return
+    for j in resp.journeys:
+        for leg in j.legs:
+            kind = leg.WhichOneof("leg_type")
+            if kind is None:
+                continue
+            msg = getattr(leg, kind)
+            points = [(p.lon, p.lat) for p in msg.path]
+            del msg.path[:]
+            if encoding == routing_pb2.PATH_ENCODING_POLYLINE:
+                msg.path_polyline = polyline.encode(points)
+            else:
+                msg.path_lon.extend(p[0] for p in points)
+                msg.path_lat.extend(p[1] for p in points)
+
+
+def _stop(stop_id: int, name: str, point: Tuple[float, float]):
+    return routing_pb2.Stop(
+        stop_id=stop_id,
+        name=name,
+        coord=routing_pb2.Coordinate(lon=point[0], lat=point[1]),
+    )
+
+
+class LocalRoutingServicer(routing_pb2_grpc.RoutingServiceServicer):
+    """Synthetic RoutingService.
+
+    `delay_s` is added once per RPC to simulate the real server's round trip and
+    planning overhead.
+    """
+
+    def __init__(self, delay_s: float = 0.0):
+        self.delay_s = delay_s
+
+    def HealthCheck(self, request, context):
+        return routing_pb2.HealthResponse(status="ok", message="local stand-in routing server")
+
+    def FindRoute(self, request, context):
+        self._sleep()
+        resp, code, details = self._route(request)
+        if code != grpc.StatusCode.OK:
+            context.abort(code, details)
+        return resp
+
+    def FindRoutesBatch(self, request, context):
+        self._sleep()
+        out = routing_pb2.BatchRouteResponse()
+        for i, req in enumerate(request.requests):
+            resp, code, details = self._route(req)
+            item = out.results.add(index=i, status_code=code.value[0], error=details)
+            if resp is not None:
+                item.response.CopyFrom(resp)
+        return out
+
+    def FindRouteStream(self, request, context):
+        self._sleep()
+        resp, code, details = self._route(request)
+        if code != grpc.StatusCode.OK:
+            context.abort(code, details)
+        for j in resp.journeys:
+            yield j
+
+    def _sleep(self) -> None:
+        if self.delay_s > 0:
+            time.sleep(self.delay_s)
+
+    def _route(self, req) -> Tuple[Optional[object], grpc.StatusCode, str]:
+        start = (req.start_lon, req.start_lat)
+        end = (req.end_lon, req.end_lat)
+        total = _haversine_m(req.start_lat, req.start_lon, req.end_lat, req.end_lon)
+        if total < 1.0:
+            return None, grpc.StatusCode.NOT_FOUND, "origin and destination are the same place"
+
+        walking_cutoff = req.walking_cutoff or 1000.0
+        top_k = req.top_k or 5
+
+        journeys = []
+        if total <= walking_cutoff:
+            journeys.append(self._walk_only(start, end))
+        journeys.append(self._direct(start, end, walking_cutoff))
+        if req.max_transfers >= 1:
+            journeys.append(self._one_transfer(start, end, walking_cutoff))
+        journeys = journeys[:max(1, top_k)]
+        for i, j in enumerate(journeys, start=1):
+            j.id = i
+
+        resp = routing_pb2.RouteResponse(
+            num_journeys=len(journeys),
+            journeys=journeys,
+            start_trips_found=len(journeys),
+            end_trips_found=len(journeys),
+            total_routes_found=len(journeys),
+        )
+        if req.HasField("include_geometry") and not req.include_geometry:
+            _strip_paths(resp)
+        else:
+            _encode_paths(resp, req.path_encoding)
+        return resp, grpc.StatusCode.OK, ""
+
+    def _walk_only(self, start, end):
+        j = routing_pb2.Journey(text_summary="Walk")
+        points, dist = _line(start, end)
+        walk = j.legs.add().walk
+        walk.distance_meters = int(dist)
+        walk.duration_minutes = int(math.ceil(dist / _WALK_M_PER_MIN))
+        _fill_path(walk, points)
+        self._summarize(j)
+        return j
+
+    def _access_fraction(self, start, end, walking_cutoff: float) -> float:
+        total = _haversine_m(start[1], start[0], end[1], end[0])
+        return min(0.1, (walking_cutoff / 2) / total)
+
+    def _direct(self, start, end, walking_cutoff: float):
+        f = self._access_fraction(start, end, walking_cutoff)
+        board, alight = _lerp(start, end, f), _lerp(start, end, 1 - f)
+        j = routing_pb2.Journey(text_summary="Walk → Bus → Walk")
+        self._add_walk(j, start, board)
+        self._add_trip(j, "LOCAL-1-07:00:00", "1", board, alight, 1)
+        self._add_walk(j, alight, end)
+        self._summarize(j)
+        return j
+
+    def _one_transfer(self, start, end, walking_cutoff: float):
+        f = self._access_fraction(start, end, walking_cutoff)
+        board, alight = _lerp(start, end, f), _lerp(start, end, 1 - f)
+        mid_a, mid_b = _lerp(start, end, 0.5), _lerp(start, end, 0.52)
+        j = routing_pb2.Journey(text_summary="Walk → Tram → Transfer → Microbus → Walk")
+        self._add_walk(j, start, board)
+        self._add_trip(j, "LOCAL-2-07:00:00", "2", board, mid_a, 10, mode="Tram")
+        points, dist = _line(mid_a, mid_b)
+        tr = j.legs.add().transfer
+        tr.from_trip_id = "LOCAL-2-07:00:00"
+        tr.to_trip_id = "LOCAL-3-07:00:00"
+        tr.from_trip_name = "2"
+        tr.to_trip_name = "3"
+        tr.walking_distance_meters = int(dist)
+        tr.duration_minutes = int(math.ceil(dist / _WALK_M_PER_MIN))
+        _fill_path(tr, points)
+        self._add_trip(j, "LOCAL-3-07:00:00", "3", mid_b, alight, 20, mode="Microbus")
+        self._add_walk(j, alight, end)
+        self._summarize(j)
+        return j
+
+    def _add_walk(self, j, a, b) -> None:
+        points, dist = _line(a, b)
+        walk = j.legs.add().walk
+        walk.distance_meters = int(dist)
+        walk.duration_minutes = int(math.ceil(dist / _WALK_M_PER_MIN))
+        _fill_path(walk, points)
+
+    def _add_trip(self, j, trip_id: str, short_name: str, a, b, stop_base: int, mode: str = "Bus") -> None:
+        points, dist = _line(a, b)
+        trip = j.legs.add().trip
+        trip.trip_id = trip_id
+        trip.mode = mode
+        trip.route_short_name = short_name
+        trip.headsign = f"Line {short_name}"
+        trip.fare = _FARE_PER_TRIP
+        trip.duration_minutes = int(math.ceil(dist / _RIDE_M_PER_MIN))
+        getattr(trip, "from").CopyFrom(_stop(stop_base, f"Stop {stop_base}", a))
+        trip.to.CopyFrom(_stop(stop_base + 1, f"Stop {stop_base + 1}", b))
+        _fill_path(trip, points)
+
+    def _summarize(self, j) -> None:
+        s = j.summary
+        for leg in j.legs:
+            if leg.HasField("walk"):
+                s.total_time_minutes += leg.walk.duration_minutes
+                s.total_distance_meters += leg.walk.distance_meters
+                s.walking_distance_meters += leg.walk.distance_meters
+            elif leg.HasField("trip"):
+                s.total_time_minutes += leg.trip.duration_minutes
+                s.cost += leg.trip.fare
+                if leg.trip.mode not in s.modes:
+                    s.modes.append(leg.trip.mode)
+            elif leg.HasField("transfer"):
+                s.total_time_minutes += leg.transfer.duration_minutes
+                s.walking_distance_meters += leg.transfer.walking_distance_meters
+                s.transfers += 1
+
+
+def serve(addr: str = "localhost:50051", max_workers: int = 10, delay_s: float = 0.0) -> grpc.Server:
+    """Start the stand-in server on `addr` and return it (already running)."""
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
+    routing_pb2_grpc.add_RoutingServiceServicer_to_server(LocalRoutingServicer(delay_s=delay_s), server)
+    server.add_insecure_port(addr)
+    server.start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in routing gRPC server")
+    parser.add_argument("--addr", default="localhost:50051")
+    parser.add_argument("--workers", type=int, default=10)
+    parser.add_argument("--delay", type=float, default=0.0, help="simulated per-RPC latency (s)")
+    args = parser.parse_args()
+
+    srv = serve(args.addr, max_workers=args.workers, delay_s=args.delay)
+    print(f"Local routing server listening on {args.addr}")
+    srv.wait_for_termination()
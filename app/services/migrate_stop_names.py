@@ -0,0 +1,67 @@
+"""Add a normalized, trigram-indexed `stop.name_norm` column.
+
+Without it every geocoding query normalizes `name` row by row, which rules out
+the trigram index and forces a sequential scan. This creates:
+
+- `norm_ar(text)`: the arabic_norm pipeline as an IMMUTABLE SQL function;
+- `stop.name_norm`, filled with `norm_ar(name)` and kept in sync by a trigger;
+- a GIN `gin_trgm_ops` index on `name_norm`, so `name_norm % q` is an index scan.
+
+Re-running is safe and also re-normalizes existing rows after the rules change.
+
+    python -m app.services.migrate_stop_names            # apply (DB_* env)
+    python -m app.services.migrate_stop_names --print    # just print the SQL
+"""
+import argparse
+import os
+
+from app.services.arabic_norm import sql_function_ddl
+
+STATEMENTS = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm;",
+    sql_function_ddl("norm_ar"),
+    "ALTER TABLE stop ADD COLUMN IF NOT EXISTS name_norm text;",
+    "UPDATE stop SET name_norm = norm_ar(name) WHERE name_norm IS DISTINCT FROM norm_ar(name);",
+    (
+        "CREATE OR REPLACE FUNCTION stop_name_norm_sync() RETURNS trigger LANGUAGE plpgsql AS $$ "
+        "BEGIN NEW.name_norm := norm_ar(NEW.name); RETURN NEW; END $$;"
+    ),
+    "DROP TRIGGER IF EXISTS stop_name_norm_sync ON stop;",
+    (
+        "CREATE TRIGGER stop_name_norm_sync BEFORE INSERT OR UPDATE OF name ON stop "
+        "FOR EACH ROW EXECUTE FUNCTION stop_name_norm_sync();"
+    ),
+    "CREATE INDEX IF NOT EXISTS stop_name_norm_trgm_idx ON stop USING gin (name_norm gin_trgm_ops);",
+    "ANALYZE stop;",
+]
+
+
+def migrate(conn) -> None:
+    with conn:
+        with conn.cursor() as cur:
+            for sql in STATEMENTS:
+                cur.execute(sql)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add the normalized stop name column + trigram index")
+    parser.add_argument("--print", action="store_true", help="print the SQL instead of running it")
+    args = parser.parse_args()
+
+    if args.print:
+        print("\n".join(STATEMENTS))
+    else:
+        import psycopg2
+
+        conn = psycopg2.connect(
+            host=os.environ.get("DB_HOST", "localhost"),
+            port=int(os.environ.get("DB_PORT", "5432")),
+            database=os.environ.get("DB_NAME", "transport_db"),
+            user=os.environ.get("DB_USER", "postgres"),
+            password=os.environ.get("DB_PASSWORD", "postgres"),
+        )
+        try:
+            migrate(conn)
+        finally:
+            conn.close()
+        print("stop.name_norm ready")
@@ -0,0 +1,182 @@
+"""Shared Nominatim client with a process-wide, prioritized rate limit.
+
+One geolocator is reused for every lookup (its requests.Session keeps the HTTP
+connection alive), and all lookups — from any thread, session or event loop —
+draw from a single token bucket, so the public instance's 1 request/second
+policy holds for the whole process. Interactive lookups are served before
+queued batch ones.
+
+Env:
+- NOMINATIM_DOMAIN / NOMINATIM_SCHEME: point at a self-hosted or mock server
+  (default nominatim.openstreetmap.org over https).
+- NOMINATIM_RATE_PER_S: request rate (default 1.0).
+"""
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+import weakref
+from typing import Any, Optional
+
+from geopy.geocoders import Nominatim
+
+INTERACTIVE = 0
+BATCH = 10
+
+_USER_AGENT = "alex_transit_agent"
+
+
+class PriorityRateLimiter:
+    """Token bucket where waiters are served by (priority, arrival) order.
+
+    Lower priority values go first. Usable from threads (`acquire`) and from
+    coroutines (`acquire_async`) at the same time.
+    """
+
+    def __init__(self, rate_per_s: float = 1.0, burst: int = 1):
+        self.rate = float(rate_per_s)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._cond = threading.Condition()
+        self._heap: list = []
+        self._seq = itertools.count()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def _try_take(self, entry) -> Optional[float]:
+        """Take a token if `entry` is at the head; else return seconds to wait (caller holds the lock)."""
+        self._refill()
+        if self._heap[0] is entry:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                heapq.heappop(self._heap)
+                self._cond.notify_all()
+                return None
+            return (1.0 - self._tokens) / self.rate
+        return -1.0  # not our turn: wait for a notification
+
+    def _leave(self, entry) -> None:
+        if entry in self._heap:
+            self._heap.remove(entry)
+            heapq.heapify(self._heap)
+            self._cond.notify_all()
+
+    def acquire(self, priority: int = INTERACTIVE, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        entry = [priority, next(self._seq)]
+        with self._cond:
+            heapq.heappush(self._heap, entry)
+            try:
+                while True:
+                    wait = self._try_take(entry)
+                    if wait is None:
+                        return True
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            return False
+                        wait = remaining if wait < 0 else min(wait, remaining)
+                    # async waiters at the head don't notify while they sleep,
+                    # so poll occasionally instead of waiting forever
+                    self._cond.wait(wait if wait >= 0 else 0.25)
+            finally:
+                self._leave(entry)
+
+    async def acquire_async(self, priority: int = INTERACTIVE) -> None:
+        entry = [priority, next(self._seq)]
+        with self._cond:
+            heapq.heappush(self._heap, entry)
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try_take(entry)
+                if wait is None:
+                    return
+                await asyncio.sleep(wait if wait >= 0 else 0.05)
+        finally:
+            with self._cond:
+                self._leave(entry)
+
+
+limiter = PriorityRateLimiter(rate_per_s=float(os.getenv("NOMINATIM_RATE_PER_S", "1.0")))
+
+
+def _geolocator_kwargs() -> dict:
+    return {
+        "user_agent": _USER_AGENT,
+        "domain": os.getenv("NOMINATIM_DOMAIN", "nominatim.openstreetmap.org"),
+        "scheme": os.getenv("NOMINATIM_SCHEME", "https"),
+        "timeout": 10,
+    }
+
+
+_geolocator: Optional[Nominatim] = None
+_geolocator_lock = threading.Lock()
+
+
+def _get_geolocator() -> Nominatim:
+    global _geolocator
+    if _geolocator is None:
+        with _geolocator_lock:
+            if _geolocator is None:
+                _geolocator = Nominatim(**_geolocator_kwargs())
+    return _geolocator
+
+
+def geocode(query: str, priority: int = INTERACTIVE, timeout: float = 10, **kwargs: Any):
+    """Rate-limited `Nominatim.geocode` (Egypt only, single best result).
+
+    Returns a geopy Location or None; network/HTTP errors raise.
+    """
+    limiter.acquire(priority)
+    return _get_geolocator().geocode(
+        query,
+        exactly_one=True,
+        country_codes="eg",
+        addressdetails=False,
+        timeout=timeout,
+        **kwargs,
+    )
+
+
+# aio geolocators hold an aiohttp session bound to the loop that created it
+_aio_geolocators: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Nominatim]" = weakref.WeakKeyDictionary()
+
+
+def _get_aio_geolocator() -> Nominatim:
+    loop = asyncio.get_running_loop()
+    geolocator = _aio_geolocators.get(loop)
+    if geolocator is None:
+        try:
+            from geopy.adapters import AioHTTPAdapter
+        except ImportError as e:
+            raise ImportError("Async geocoding needs aiohttp: pip install aiohttp") from e
+        geolocator = Nominatim(adapter_factory=AioHTTPAdapter, **_geolocator_kwargs())
+        _aio_geolocators[loop] = geolocator
+    return geolocator
+
+
+async def geocode_async(query: str, priority: int = INTERACTIVE, timeout: float = 10, **kwargs: Any):
+    """Async `geocode` on geopy's AioHTTPAdapter; shares the process-wide limiter."""
+    await limiter.acquire_async(priority)
+    return await _get_aio_geolocator().geocode(
+        query,
+        exactly_one=True,
+        country_codes="eg",
+        addressdetails=False,
+        timeout=timeout,
+        **kwargs,
+    )
+
+
+async def close_async() -> None:
+    """Close the aiohttp session opened on the current event loop."""
+    geolocator = _aio_geolocators.pop(asyncio.get_running_loop(), None)
+    if geolocator is not None:
+        await geolocator.adapter.__aexit__(None, None, None)
@@ -0,0 +1,77 @@
+"""Encoded polyline codec (Google's algorithm) for routing leg geometry.
+
+The routing server uses precision 6 (1e-6 degrees, ~0.1 m) rather than
+Google's default 5, so GTFS shape points survive the round trip. Points are
+encoded as (lat, lon) pairs per the format; the helpers here take and return
+(lon, lat) like the rest of the routing code.
+"""
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+PRECISION = 6
+
+
+def _encode_value(v: int, out: List[str]) -> None:
+    v = ~(v << 1) if v < 0 else (v << 1)
+    while v >= 0x20:
+        out.append(chr((0x20 | (v & 0x1F)) + 63))
+        v >>= 5
+    out.append(chr(v + 63))
+
+
+def encode(points: Sequence[Tuple[float, float]], precision: int = PRECISION) -> str:
+    """Encode (lon, lat) points."""
+    factor = 10 ** precision
+    out: List[str] = []
+    prev_lat = prev_lon = 0
+    for lon, lat in points:
+        lat_i = int(round(lat * factor))
+        lon_i = int(round(lon * factor))
+        _encode_value(lat_i - prev_lat, out)
+        _encode_value(lon_i - prev_lon, out)
+        prev_lat, prev_lon = lat_i, lon_i
+    return "".join(out)
+
+
+def decode(encoded: str, precision: int = PRECISION) -> List[Tuple[float, float]]:
+    """Decode to a list of (lon, lat) tuples."""
+    factor = float(10 ** precision)
+    points: List[Tuple[float, float]] = []
+    index = lat = lon = 0
+    n = len(encoded)
+    while index < n:
+        deltas = []
+        for _ in range(2):
+            shift = result = 0
+            while True:
+                b = ord(encoded[index]) - 63
+                index += 1
+                result |= (b & 0x1F) << shift
+                shift += 5
+                if b < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        lat += deltas[0]
+        lon += deltas[1]
+        points.append((lon / factor, lat / factor))
+    return points
+
+
+def decode_array(encoded: str, precision: int = PRECISION) -> np.ndarray:
+    """Vectorized decode to a `(n, 2)` float64 array of `[lon, lat]` rows."""
+    if not encoded:
+        return np.empty((0, 2), dtype=np.float64)
+
+    chunks = np.frombuffer(encoded.encode("ascii"), dtype=np.uint8).astype(np.int64) - 63
+    last = (chunks & 0x20) == 0  # final 5-bit chunk of each value
+    # value index of every chunk and the chunk's position inside its value
+    value_idx = np.concatenate(([0], np.cumsum(last)[:-1]))
+    idx = np.arange(chunks.size)
+    first = np.concatenate(([True], last[:-1]))
+    pos = idx - np.maximum.accumulate(np.where(first, idx, 0))
+
+    values = np.bincount(value_idx, weights=(chunks & 0x1F) << (5 * pos)).astype(np.int64)
+    deltas = np.where(values & 1, ~(values >> 1), values >> 1)
+    lat_lon = np.cumsum(deltas.reshape(-1, 2), axis=0) / float(10 ** precision)
+    return lat_lon[:, ::-1].copy()
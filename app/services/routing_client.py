@@ -1,9 +1,20 @@
+import asyncio
+import atexit
+import hashlib
+import itertools
 import os
 import sys
+import threading
+import weakref
 import grpc
-from typing import List, Dict, Any, Optional
+import grpc.aio
+from typing import AsyncIterator, Iterator, List, Dict, Any, Optional
 from dotenv import load_dotenv
 
+from app.services.cache import SqliteStore, TTLCache
+from app.services.journey_views import JourneyView, journey_to_dict
+from app.services.singleflight import AsyncSingleFlight, SingleFlight
+
 
 load_dotenv()
 
@@ -33,21 +44,120 @@ def _default_routing_addr() -> str:
     return "localhost:50051"
 
 
+class RoutingError(RuntimeError):
+    """Raised by the streaming helpers when the routing server reports an error."""
+
+
+def _routing_targets() -> List[str]:
+    # ROUTING_SERVER_ADDR may list several endpoints ("host1:50051,host2:50051");
+    # calls are spread over them round-robin.
+    targets = [t.strip() for t in _default_routing_addr().split(",") if t.strip()]
+    return targets or ["localhost:50051"]
+
+
+def _channel_options() -> List[tuple]:
+    return [
+        # Keepalive pings detect dead connections. gRPC servers by default
+        # allow at most one ping per 5 min and none without active calls;
+        # pinging more often gets a GOAWAY "too_many_pings", which tears the
+        # pooled channel down. Only go below 300000 ms if the server sets
+        # grpc.http2.min_ping_interval_without_data_ms to match.
+        ("grpc.keepalive_time_ms", int(os.getenv("ROUTING_KEEPALIVE_MS", "300000"))),
+        ("grpc.keepalive_timeout_ms", int(os.getenv("ROUTING_KEEPALIVE_TIMEOUT_MS", "10000"))),
+        # Responses with full geometry for top_k journeys can be large.
+        ("grpc.max_receive_message_length", 64 * 1024 * 1024),
+    ]
+
+
+class ChannelPool:
+    """Process-wide cache of long-lived gRPC channels, one per routing target.
+
+    Channels are created lazily on first use and reused by every later call, so
+    the HTTP/2 connection (and its TCP handshake) is paid once per target rather
+    than once per request. `stub()` rotates over the configured targets.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._channels: Dict[str, grpc.Channel] = {}
+        self._stubs: Dict[str, Any] = {}
+        self._rr = itertools.count()
+
+    def stub(self, target: Optional[str] = None):
+        if target is None:
+            targets = _routing_targets()
+            target = targets[next(self._rr) % len(targets)]
+
+        stub = self._stubs.get(target)
+        if stub is not None:
+            return stub
+
+        with self._lock:
+            stub = self._stubs.get(target)
+            if stub is None:
+                channel = grpc.insecure_channel(target, options=_channel_options())
+                stub = routing_pb2_grpc.RoutingServiceStub(channel)
+                self._channels[target] = channel
+                self._stubs[target] = stub
+            return stub
+
+    def close(self) -> None:
+        with self._lock:
+            channels = list(self._channels.values())
+            self._channels.clear()
+            self._stubs.clear()
+        for channel in channels:
+            try:
+                channel.close()
+            except Exception:
+                pass
+
+
+_channel_pool = ChannelPool()
+atexit.register(_channel_pool.close)
+
+
 def _get_stub():
-    channel = grpc.insecure_channel(_default_routing_addr())
-    return routing_pb2_grpc.RoutingServiceStub(channel)
+    return _channel_pool.stub()
+
+
+def close_channels() -> None:
+    """Close all pooled routing channels (they are reopened on next use)."""
+    _channel_pool.close()
 
 
-def health_check() -> Dict[str, Any]:
+def _default_timeout() -> Optional[float]:
+    raw = os.getenv("ROUTING_TIMEOUT_S", "")
+    return float(raw) if raw else None
+
+
+def health_check(timeout: Optional[float] = None) -> Dict[str, Any]:
     stub = _get_stub()
     try:
-        resp = stub.HealthCheck(routing_pb2.HealthRequest())
+        resp = stub.HealthCheck(routing_pb2.HealthRequest(), timeout=timeout or _default_timeout())
         return {"status": resp.status, "message": resp.message}
     except Exception as e:
         return {"status": "unreachable", "message": str(e)}
 
 
-def find_route(
+_PATH_ENCODINGS = {
+    "coordinates": routing_pb2.PATH_ENCODING_COORDINATES,
+    "packed": routing_pb2.PATH_ENCODING_PACKED,
+    "polyline": routing_pb2.PATH_ENCODING_POLYLINE,
+}
+
+
+def _path_encoding(name: Optional[str]) -> int:
+    # Every encoding is decoded transparently (and servers that don't know the
+    # flag keep sending coordinates), so the default can be the most compact one;
+    # see testings/path_encoding_bench.py for size/decode numbers.
+    name = (name or os.getenv("ROUTING_PATH_ENCODING", "polyline")).lower()
+    if name not in _PATH_ENCODINGS:
+        raise ValueError(f"Unknown path encoding {name!r}; expected one of {sorted(_PATH_ENCODINGS)}")
+    return _PATH_ENCODINGS[name]
+
+
+def _build_route_request(
     start_lat: float,
     start_lon: float,
     end_lat: float,
@@ -57,10 +167,9 @@ def find_route(
     restricted_modes: Optional[List[str]] = None,
     weights: Optional[Dict[str, float]] = None,
     top_k: int = 5,
-) -> Dict[str, Any]:
-    """Call the remote gRPC FindRoute and return parsed dict."""
-    stub = _get_stub()
-
+    path_encoding: Optional[str] = None,
+    include_geometry: bool = True,
+):
     routing_weights = None
     if weights is not None:
         routing_weights = routing_pb2.RoutingWeights(
@@ -70,7 +179,7 @@ def find_route(
             transfer=float(weights.get("transfer", 1.0)),
         )
 
-    req = routing_pb2.RouteRequest(
+    return routing_pb2.RouteRequest(
         start_lon=start_lon,
         start_lat=start_lat,
         end_lon=end_lon,
@@ -80,30 +189,36 @@ def find_route(
         restricted_modes=list(restricted_modes or []),
         weights=routing_weights,
         top_k=int(top_k),
+        path_encoding=_path_encoding(path_encoding),
+        include_geometry=bool(include_geometry),
     )
-    try:
-        resp = stub.FindRoute(req)
-    except grpc.RpcError as e:
-        code = e.code()
-        details = e.details() if hasattr(e, "details") else str(e)
-
-        # The updated server uses NOT_FOUND to indicate "no suitable trips".
-        # Treat that as a valid empty response so downstream formatting can say
-        # "no journeys" instead of "routing failed".
-        if code == grpc.StatusCode.NOT_FOUND:
-            return {
-                "num_journeys": 0,
-                "journeys": [],
-                "start_trips_found": 0,
-                "end_trips_found": 0,
-                "total_routes_found": 0,
-                "message": details,
-            }
-
-        return {"num_journeys": 0, "journeys": [], "error": details}
-    except Exception as e:
-        return {"num_journeys": 0, "journeys": [], "error": str(e)}
 
+
+def _rpc_error_to_dict(e: grpc.RpcError) -> Dict[str, Any]:
+    code = e.code()
+    details = e.details() if hasattr(e, "details") else str(e)
+
+    # The updated server uses NOT_FOUND to indicate "no suitable trips".
+    # Treat that as a valid empty response so downstream formatting can say
+    # "no journeys" instead of "routing failed".
+    if code == grpc.StatusCode.NOT_FOUND:
+        return {
+            "num_journeys": 0,
+            "journeys": [],
+            "start_trips_found": 0,
+            "end_trips_found": 0,
+            "total_routes_found": 0,
+            "message": details,
+        }
+
+    return {"num_journeys": 0, "journeys": [], "error": details}
+
+
+def _journey_to_dict(j) -> Dict[str, Any]:
+    return journey_to_dict(j)
+
+
+def _response_to_dict(resp, lazy: bool = False) -> Dict[str, Any]:
     if getattr(resp, "error", ""):
         return {
             "num_journeys": 0,
@@ -114,79 +229,10 @@ def find_route(
             "total_routes_found": getattr(resp, "total_routes_found", 0),
         }
 
-    journeys: List[Dict[str, Any]] = []
-    for j in resp.journeys:
-        legs: List[Dict[str, Any]] = []
-        for leg in j.legs:
-            # oneof: walk/trip/transfer
-            if leg.HasField("walk"):
-                wl = leg.walk
-                legs.append(
-                    {
-                        "type": "walk",
-                        "distance_meters": int(wl.distance_meters),
-                        "duration_minutes": int(wl.duration_minutes),
-                        "path": [{"lon": float(p.lon), "lat": float(p.lat)} for p in wl.path],
-                    }
-                )
-            elif leg.HasField("trip"):
-                tl = leg.trip
-                # protobuf may expose "from" as "from_" (newer) or via getattr (older)
-                from_stop = getattr(tl, "from_", None) or getattr(tl, "from", None)
-                to_stop = tl.to
-                legs.append(
-                    {
-                        "type": "trip",
-                        "trip_id": str(tl.trip_id),
-                        "mode": str(tl.mode),
-                        "route_short_name": str(tl.route_short_name),
-                        "headsign": str(tl.headsign),
-                        "fare": float(tl.fare),
-                        "duration_minutes": int(tl.duration_minutes),
-                        "from": {
-                            "stop_id": int(from_stop.stop_id) if from_stop else 0,
-                            "name": str(from_stop.name) if from_stop else "",
-                            "coord": {"lon": float(from_stop.coord.lon), "lat": float(from_stop.coord.lat)} if from_stop else {"lon": 0, "lat": 0},
-                        },
-                        "to": {
-                            "stop_id": int(to_stop.stop_id) if to_stop else 0,
-                            "name": str(to_stop.name) if to_stop else "",
-                            "coord": {"lon": float(to_stop.coord.lon), "lat": float(to_stop.coord.lat)} if to_stop else {"lon": 0, "lat": 0},
-                        },
-                        "path": [{"lon": float(p.lon), "lat": float(p.lat)} for p in tl.path],
-                    }
-                )
-            elif leg.HasField("transfer"):
-                tr = leg.transfer
-                legs.append(
-                    {
-                        "type": "transfer",
-                        "from_trip_id": str(tr.from_trip_id),
-                        "to_trip_id": str(tr.to_trip_id),
-                        "from_trip_name": str(tr.from_trip_name),
-                        "to_trip_name": str(tr.to_trip_name),
-                        "walking_distance_meters": int(tr.walking_distance_meters),
-                        "duration_minutes": int(tr.duration_minutes),
-                        "path": [{"lon": float(p.lon), "lat": float(p.lat)} for p in tr.path],
-                    }
-                )
-
-        summary = getattr(j, "summary", None)
-        journeys.append(
-            {
-                "id": int(getattr(j, "id", 0)),
-                "text_summary": str(getattr(j, "text_summary", "")),
-                "summary": {
-                    "total_time_minutes": int(getattr(summary, "total_time_minutes", 0)) if summary else 0,
-                    "total_distance_meters": int(getattr(summary, "total_distance_meters", 0)) if summary else 0,
-                    "walking_distance_meters": int(getattr(summary, "walking_distance_meters", 0)) if summary else 0,
-                    "transfers": int(getattr(summary, "transfers", 0)) if summary else 0,
-                    "cost": float(getattr(summary, "cost", 0.0)) if summary else 0.0,
-                    "modes": list(getattr(summary, "modes", [])) if summary else [],
-                },
-                "legs": legs,
-            }
-        )
+    if lazy:
+        journeys = [JourneyView(j) for j in resp.journeys]
+    else:
+        journeys = [_journey_to_dict(j) for j in resp.journeys]
 
     return {
         "num_journeys": resp.num_journeys,
@@ -195,3 +241,474 @@ def find_route(
         "end_trips_found": resp.end_trips_found,
         "total_routes_found": getattr(resp, "total_routes_found", 0),
     }
+
+
+# ---------------------------------------------------------------------------
+# Result cache
+# ---------------------------------------------------------------------------
+
+def _route_cache_from_env() -> TTLCache:
+    # Entries are serialized RouteResponse bytes, so a hit is re-parsed into
+    # fresh dicts/views and callers can't mutate each other's results.
+    db_path = os.getenv("ROUTE_CACHE_DB", "")
+    store = SqliteStore(db_path, table="route_cache", dumps=bytes, loads=bytes) if db_path else None
+    return TTLCache(
+        maxsize=int(os.getenv("ROUTE_CACHE_SIZE", "256")),
+        ttl=float(os.getenv("ROUTE_CACHE_TTL_S", "600")),
+        store=store,
+        max_weight=int(float(os.getenv("ROUTE_CACHE_MAX_MB", "64")) * 1024 * 1024),
+        weigh=len,
+    )
+
+
+_route_cache = _route_cache_from_env()
+
+
+def _snap_request(req) -> None:
+    """Snap the request's endpoints to the cache grid, in place.
+
+    Snapping happens before the request is sent, so a cached result always
+    matches its key exactly; ROUTE_CACHE_GRID_DEG (default 0.0002° ≈ 20 m)
+    controls how close two geocodes must be to share an entry.
+    """
+    grid = float(os.getenv("ROUTE_CACHE_GRID_DEG", "0.0002"))
+    if grid > 0:
+        for field in ("start_lat", "start_lon", "end_lat", "end_lon"):
+            setattr(req, field, round(round(getattr(req, field) / grid) * grid, 7))
+
+
+def _request_key(req) -> str:
+    return hashlib.sha1(req.SerializeToString(deterministic=True)).hexdigest()
+
+
+def _cache_key(req, use_cache: bool) -> str:
+    # The key identifies the (normalized) request for both the cache and
+    # request coalescing, so it is computed even when caching is off.
+    if use_cache and _route_cache.enabled:
+        _snap_request(req)
+    return _request_key(req)
+
+
+def _cached_response(req, use_cache: bool):
+    """Return `(key, cached RouteResponse or None)`."""
+    key = _cache_key(req, use_cache)
+    if not (use_cache and _route_cache.enabled):
+        return key, None
+    payload = _route_cache.get(key)
+    if payload is None:
+        return key, None
+    return key, routing_pb2.RouteResponse.FromString(payload)
+
+
+async def _cached_response_async(req, use_cache: bool):
+    """`_cached_response` without blocking the loop on ROUTE_CACHE_DB."""
+    key = _cache_key(req, use_cache)
+    if not (use_cache and _route_cache.enabled):
+        return key, None
+    payload = await _route_cache.get_async(key)
+    if payload is None:
+        return key, None
+    return key, routing_pb2.RouteResponse.FromString(payload)
+
+
+def _store_response(key: str, resp, use_cache: bool) -> None:
+    if use_cache and not getattr(resp, "error", ""):
+        _route_cache.set(key, resp.SerializeToString())
+
+
+async def _store_response_async(key: str, resp, use_cache: bool) -> None:
+    if use_cache and not getattr(resp, "error", ""):
+        await _route_cache.set_async(key, resp.SerializeToString())
+
+
+# Concurrent identical FindRoute calls share one RPC (and its response message;
+# each caller still converts it into its own dicts/views).
+_route_flight = SingleFlight()
+_route_flight_async = AsyncSingleFlight()
+
+
+def route_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the find_route result cache."""
+    return _route_cache.stats()
+
+
+def clear_route_cache() -> None:
+    _route_cache.clear()
+
+
+def find_route(
+    start_lat: float,
+    start_lon: float,
+    end_lat: float,
+    end_lon: float,
+    walking_cutoff: float = 1000.0,
+    max_transfers: int = 2,
+    restricted_modes: Optional[List[str]] = None,
+    weights: Optional[Dict[str, float]] = None,
+    top_k: int = 5,
+    path_encoding: Optional[str] = None,
+    include_geometry: bool = True,
+    timeout: Optional[float] = None,
+    lazy: bool = False,
+    use_cache: bool = True,
+) -> Dict[str, Any]:
+    """Call the remote gRPC FindRoute and return parsed dict.
+
+    `path_encoding` asks the server for "coordinates", "packed" or "polyline"
+    geometry (default ROUTING_PATH_ENCODING, else "polyline"); the result is
+    the same either way, up to the polyline's 1e-6 degree rounding. With
+    `include_geometry=False` the server omits leg geometry (every "path" comes
+    back empty), which is all the LLM formatting needs. `timeout` is the
+    per-call deadline in seconds (defaults to ROUTING_TIMEOUT_S, unset means no
+    deadline). With `lazy=True` the journeys are read-only `JourneyView`s over
+    the response message instead of fully converted dicts; see
+    `app/services/journey_views.py`.
+
+    Successful responses are cached (LRU + TTL, see ROUTE_CACHE_* env vars)
+    under the request with endpoints snapped to a small grid; pass
+    `use_cache=False` to always hit the server. Concurrent calls for the same
+    request share a single in-flight RPC either way.
+    """
+    req = _build_route_request(
+        start_lat, start_lon, end_lat, end_lon,
+        walking_cutoff=walking_cutoff,
+        max_transfers=max_transfers,
+        restricted_modes=restricted_modes,
+        weights=weights,
+        top_k=top_k,
+        path_encoding=path_encoding,
+        include_geometry=include_geometry,
+    )
+    return _call_find_route(req, timeout, lazy=lazy, use_cache=use_cache)
+
+
+def _call_find_route(req, timeout: Optional[float], lazy: bool = False, use_cache: bool = False) -> Dict[str, Any]:
+    key, cached = _cached_response(req, use_cache)
+    if cached is not None:
+        return _response_to_dict(cached, lazy=lazy)
+
+    stub = _get_stub()
+    try:
+        resp = _route_flight.do(key, lambda: stub.FindRoute(req, timeout=timeout or _default_timeout()))
+    except grpc.RpcError as e:
+        return _rpc_error_to_dict(e)
+    except Exception as e:
+        return {"num_journeys": 0, "journeys": [], "error": str(e)}
+
+    _store_response(key, resp, use_cache)
+    return _response_to_dict(resp, lazy=lazy)
+
+
+_STATUS_BY_CODE = {c.value[0]: c for c in grpc.StatusCode}
+
+
+def _batch_item_to_dict(item) -> Dict[str, Any]:
+    code = _STATUS_BY_CODE.get(int(item.status_code), grpc.StatusCode.UNKNOWN)
+    if code == grpc.StatusCode.NOT_FOUND:
+        return {
+            "num_journeys": 0,
+            "journeys": [],
+            "start_trips_found": 0,
+            "end_trips_found": 0,
+            "total_routes_found": 0,
+            "message": str(item.error),
+        }
+    if code != grpc.StatusCode.OK:
+        return {"num_journeys": 0, "journeys": [], "error": str(item.error) or code.name}
+    return _response_to_dict(item.response)
+
+
+def find_routes_batch(
+    requests: List[Dict[str, Any]],
+    chunk_size: int = 200,
+    timeout: Optional[float] = None,
+    use_cache: bool = True,
+) -> List[Dict[str, Any]]:
+    """Route many origin/destination pairs with the FindRoutesBatch RPC.
+
+    Each item of `requests` holds `find_route` keyword arguments (start_lat,
+    start_lon, end_lat, end_lon and optionally walking_cutoff, max_transfers,
+    restricted_modes, weights, top_k, path_encoding, include_geometry). The
+    input is split into chunks of `chunk_size` that are sent concurrently
+    (round-robin over the pooled targets); `timeout` applies per chunk.
+    Results come back in input order, each in the same dict shape
+    `find_route` returns.
+
+    Requests go through the same result cache as `find_route`: endpoints are
+    snapped to ROUTE_CACHE_GRID_DEG (so both paths route the same
+    coordinates), cached items are answered locally, and duplicate items are
+    sent once. `use_cache=False` sends the coordinates as given.
+
+    Servers that don't implement the batch RPC are handled by falling back to
+    one FindRoute call per item.
+    """
+    if not requests:
+        return []
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+    # key -> (request, [input positions]) for items that need the server
+    pending: Dict[str, Any] = {}
+    for i, r in enumerate(requests):
+        req = _build_route_request(**r)
+        key, cached = _cached_response(req, use_cache)
+        if cached is not None:
+            results[i] = _response_to_dict(cached)
+        elif key in pending:
+            pending[key][1].append(i)
+        else:
+            pending[key] = (req, [i])
+
+    keys = list(pending)
+    size = max(1, int(chunk_size))
+
+    def _fill(key: str, make) -> None:
+        # one result dict per input position, so callers can't alias them
+        for i in pending[key][1]:
+            results[i] = make()
+
+    calls = []
+    for offset in range(0, len(keys), size):
+        chunk = keys[offset:offset + size]
+        stub = _get_stub()
+        future = stub.FindRoutesBatch.future(
+            routing_pb2.BatchRouteRequest(requests=[pending[k][0] for k in chunk]),
+            timeout=timeout or _default_timeout(),
+        )
+        calls.append((chunk, future))
+
+    for chunk, future in calls:
+        try:
+            resp = future.result()
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.UNIMPLEMENTED:
+                for key in chunk:
+                    _fill(key, lambda req=pending[key][0]: _call_find_route(req, timeout, use_cache=use_cache))
+            else:
+                for key in chunk:
+                    _fill(key, lambda: _rpc_error_to_dict(e))
+            continue
+        except Exception as e:
+            for key in chunk:
+                _fill(key, lambda: {"num_journeys": 0, "journeys": [], "error": str(e)})
+            continue
+
+        for item in resp.results:
+            if 0 <= item.index < len(chunk):
+                key = chunk[item.index]
+                if int(item.status_code) == 0:
+                    _store_response(key, item.response, use_cache)
+                _fill(key, lambda: _batch_item_to_dict(item))
+
+    return [
+        r if r is not None else {"num_journeys": 0, "journeys": [], "error": "missing from batch response"}
+        for r in results
+    ]
+
+
+
+def iter_journeys(
+    start_lat: float,
+    start_lon: float,
+    end_lat: float,
+    end_lon: float,
+    walking_cutoff: float = 1000.0,
+    max_transfers: int = 2,
+    restricted_modes: Optional[List[str]] = None,
+    weights: Optional[Dict[str, float]] = None,
+    top_k: int = 5,
+    path_encoding: Optional[str] = None,
+    include_geometry: bool = True,
+    timeout: Optional[float] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield journey dicts (same shape as `find_route()["journeys"]`) as they
+    arrive over the FindRouteStream RPC, so callers can render the first one
+    while the server is still producing the rest.
+
+    "No suitable trips" simply ends the stream; other failures raise
+    `RoutingError`. Servers without the streaming RPC are handled by falling
+    back to unary FindRoute. Closing the generator early cancels the RPC.
+    """
+    req = _build_route_request(
+        start_lat, start_lon, end_lat, end_lon,
+        walking_cutoff=walking_cutoff,
+        max_transfers=max_transfers,
+        restricted_modes=restricted_modes,
+        weights=weights,
+        top_k=top_k,
+        path_encoding=path_encoding,
+        include_geometry=include_geometry,
+    )
+    stream = _get_stub().FindRouteStream(req, timeout=timeout or _default_timeout())
+    yielded = False
+    try:
+        for j in stream:
+            yielded = True
+            yield _journey_to_dict(j)
+    except grpc.RpcError as e:
+        if e.code() == grpc.StatusCode.UNIMPLEMENTED and not yielded:
+            result = _call_find_route(req, timeout)
+            if result.get("error"):
+                raise RoutingError(result["error"]) from e
+            yield from result["journeys"]
+            return
+        if e.code() == grpc.StatusCode.NOT_FOUND:
+            return
+        raise RoutingError(e.details() if hasattr(e, "details") else str(e)) from e
+    finally:
+        stream.cancel()
+
+
+# ---------------------------------------------------------------------------
+# asyncio (grpc.aio) variants
+# ---------------------------------------------------------------------------
+
+class AioChannelPool:
+    """Like `ChannelPool`, but for `grpc.aio` channels.
+
+    An aio channel is bound to the event loop it was created on, so channels are
+    cached per running loop (and per target within it).
+    """
+
+    def __init__(self):
+        self._by_loop: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+        self._rr = itertools.count()
+
+    def stub(self, target: Optional[str] = None):
+        if target is None:
+            targets = _routing_targets()
+            target = targets[next(self._rr) % len(targets)]
+
+        loop = asyncio.get_running_loop()
+        entries = self._by_loop.setdefault(loop, {})
+        entry = entries.get(target)
+        if entry is None:
+            channel = grpc.aio.insecure_channel(target, options=_channel_options())
+            entry = (channel, routing_pb2_grpc.RoutingServiceStub(channel))
+            entries[target] = entry
+        return entry[1]
+
+    async def close(self) -> None:
+        loop = asyncio.get_running_loop()
+        entries = self._by_loop.pop(loop, {})
+        for channel, _ in entries.values():
+            try:
+                await channel.close()
+            except Exception:
+                pass
+
+
+_aio_channel_pool = AioChannelPool()
+
+
+async def close_channels_async() -> None:
+    """Close the aio routing channels opened on the current event loop."""
+    await _aio_channel_pool.close()
+
+
+async def health_check_async(timeout: Optional[float] = None) -> Dict[str, Any]:
+    stub = _aio_channel_pool.stub()
+    try:
+        resp = await stub.HealthCheck(routing_pb2.HealthRequest(), timeout=timeout or _default_timeout())
+        return {"status": resp.status, "message": resp.message}
+    except Exception as e:
+        return {"status": "unreachable", "message": str(e)}
+
+
+async def find_route_async(
+    start_lat: float,
+    start_lon: float,
+    end_lat: float,
+    end_lon: float,
+    walking_cutoff: float = 1000.0,
+    max_transfers: int = 2,
+    restricted_modes: Optional[List[str]] = None,
+    weights: Optional[Dict[str, float]] = None,
+    top_k: int = 5,
+    path_encoding: Optional[str] = None,
+    include_geometry: bool = True,
+    timeout: Optional[float] = None,
+    lazy: bool = False,
+    use_cache: bool = True,
+) -> Dict[str, Any]:
+    """Async `find_route` on `grpc.aio`; returns the same dict shape and shares
+    the result cache.
+
+    Cancelling the awaiting task cancels the in-flight RPC (CancelledError is
+    propagated, not converted into an error dict).
+    """
+    stub = _aio_channel_pool.stub()
+    req = _build_route_request(
+        start_lat, start_lon, end_lat, end_lon,
+        walking_cutoff=walking_cutoff,
+        max_transfers=max_transfers,
+        restricted_modes=restricted_modes,
+        weights=weights,
+        top_k=top_k,
+        path_encoding=path_encoding,
+        include_geometry=include_geometry,
+    )
+    key, cached = await _cached_response_async(req, use_cache)
+    if cached is not None:
+        return _response_to_dict(cached, lazy=lazy)
+
+    try:
+        resp = await _route_flight_async.do(key, lambda: stub.FindRoute(req, timeout=timeout or _default_timeout()))
+    except grpc.RpcError as e:
+        return _rpc_error_to_dict(e)
+    except Exception as e:
+        return {"num_journeys": 0, "journeys": [], "error": str(e)}
+
+    await _store_response_async(key, resp, use_cache)
+    return _response_to_dict(resp, lazy=lazy)
+
+
+async def iter_journeys_async(
+    start_lat: float,
+    start_lon: float,
+    end_lat: float,
+    end_lon: float,
+    walking_cutoff: float = 1000.0,
+    max_transfers: int = 2,
+    restricted_modes: Optional[List[str]] = None,
+    weights: Optional[Dict[str, float]] = None,
+    top_k: int = 5,
+    path_encoding: Optional[str] = None,
+    include_geometry: bool = True,
+    timeout: Optional[float] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Async counterpart of `iter_journeys`."""
+    stub = _aio_channel_pool.stub()
+    req = _build_route_request(
+        start_lat, start_lon, end_lat, end_lon,
+        walking_cutoff=walking_cutoff,
+        max_transfers=max_transfers,
+        restricted_modes=restricted_modes,
+        weights=weights,
+        top_k=top_k,
+        path_encoding=path_encoding,
+        include_geometry=include_geometry,
+    )
+    call = stub.FindRouteStream(req, timeout=timeout or _default_timeout())
+    yielded = False
+    try:
+        async for j in call:
+            yielded = True
+            yield _journey_to_dict(j)
+    except grpc.RpcError as e:
+        if e.code() == grpc.StatusCode.UNIMPLEMENTED and not yielded:
+            try:
+                resp = await stub.FindRoute(req, timeout=timeout or _default_timeout())
+            except grpc.RpcError as unary_err:
+                result = _rpc_error_to_dict(unary_err)
+            else:
+                result = _response_to_dict(resp)
+            if result.get("error"):
+                raise RoutingError(result["error"]) from e
+            for journey in result["journeys"]:
+                yield journey
+            return
+        if e.code() == grpc.StatusCode.NOT_FOUND:
+            return
+        raise RoutingError(e.details() if hasattr(e, "details") else str(e)) from e
+    finally:
+        call.cancel()
@@ -0,0 +1,100 @@
+"""Request coalescing ("single flight") for duplicate concurrent calls.
+
+While a call for a key is in flight, other callers asking for the same key wait
+for that call and get its result (or its exception) instead of starting their
+own. Nothing is remembered once the call finishes; pair it with a cache for that.
+"""
+import asyncio
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Thread-based single flight."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            call.waiters += 1
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    self._calls.pop(key, None)
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """asyncio single flight; calls are tracked per event loop.
+
+    The shared call runs as its own task. A waiter that gets cancelled only stops
+    waiting; the shared task is cancelled once every waiter has gone away.
+    """
+
+    def __init__(self):
+        self._by_loop: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, list]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        calls = self._by_loop.setdefault(asyncio.get_running_loop(), {})
+        entry = calls.get(key)
+        if entry is None:
+            task = asyncio.ensure_future(fn())
+            entry = calls[key] = [task, 0]
+            task.add_done_callback(lambda _t: calls.pop(key, None) if calls.get(key) is entry else None)
+
+        task = entry[0]
+        entry[1] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and entry[1] == 1:
+                # Forget the flight first: a caller arriving before the task
+                # finishes cancelling must start a fresh one, not inherit
+                # a CancelledError it didn't cause.
+                if calls.get(key) is entry:
+                    calls.pop(key, None)
+                task.cancel()
+            raise
+        finally:
+            entry[1] -= 1
+
+    def in_flight(self) -> int:
+        try:
+            calls = self._by_loop.get(asyncio.get_running_loop(), {})
+        except RuntimeError:
+            return 0
+        return len(calls)
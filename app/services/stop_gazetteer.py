@@ -0,0 +1,164 @@
+"""In-memory stop gazetteer with a pg_trgm-compatible trigram index.
+
+The Alexandria `stop` table is small, so geocoding can answer from a snapshot
+held in process instead of running a `similarity()` query per lookup. Trigrams
+and scores follow pg_trgm's rules, so results match the SQL path:
+
+- the text is lower-cased and split into words on non-alphanumeric characters
+  (Arabic diacritics count as separators, as they do for pg_trgm);
+- each word is padded as "  word " and all 3-character windows are taken;
+- similarity = |common| / (|a| + |b| - |common|), and `a % b` means
+  similarity >= pg_trgm.similarity_threshold (0.3 by default).
+"""
+import logging
+import re
+import threading
+import time
+from array import array
+from collections import defaultdict
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+# (stop_id, name, lon, lat)
+StopRow = Tuple[int, str, float, float]
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    out = set()
+    for word in _WORD_RE.findall((text or "").lower()):
+        padded = f"  {word} "
+        out.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(out)
+
+
+def similarity(a: str, b: str) -> float:
+    ta, tb = trigrams(a), trigrams(b)
+    if not ta or not tb:
+        return 0.0
+    common = len(ta & tb)
+    return common / (len(ta) + len(tb) - common)
+
+
+class _Snapshot:
+    __slots__ = ("stops", "norm_names", "sizes", "index", "loaded_at")
+
+    def __init__(self, stops: List[StopRow], normalize: Callable[[str], str]):
+        self.stops = stops
+        self.norm_names = [normalize(name) for _, name, _, _ in stops]
+        self.sizes = array("H")
+        postings: Dict[str, array] = defaultdict(lambda: array("I"))
+        for i, name in enumerate(self.norm_names):
+            grams = trigrams(name)
+            self.sizes.append(min(len(grams), 0xFFFF))
+            for g in grams:
+                postings[g].append(i)
+        self.index = dict(postings)
+        self.loaded_at = time.monotonic()
+
+
+class StopGazetteer:
+    """Trigram search over a periodically reloaded snapshot of the stops.
+
+    `search()` returns None (rather than "no match") while there is no fresh
+    snapshot, so the caller knows to ask Postgres instead; a stale or missing
+    snapshot triggers a background reload.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Iterable[StopRow]],
+        normalize: Callable[[str], str],
+        max_age_s: float = 3600.0,
+    ):
+        self._loader = loader
+        self._normalize = normalize
+        self.max_age_s = max_age_s
+        self._snapshot: Optional[_Snapshot] = None
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+
+    def is_fresh(self) -> bool:
+        snap = self._snapshot
+        return snap is not None and (time.monotonic() - snap.loaded_at) < self.max_age_s
+
+    def __len__(self) -> int:
+        snap = self._snapshot
+        return len(snap.stops) if snap else 0
+
+    def refresh(self) -> None:
+        """Reload the snapshot synchronously (exceptions propagate)."""
+        start = time.time()
+        snap = _Snapshot(list(self._loader()), self._normalize)
+        self._snapshot = snap
+        logger.info(f"[GAZETTEER] Loaded {len(snap.stops)} stops in {time.time() - start:.2f}s")
+
+    def refresh_async(self) -> None:
+        """Reload in a background thread unless a reload is already running."""
+        with self._refresh_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def _run():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"[GAZETTEER] Refresh failed: {e}")
+            finally:
+                with self._refresh_lock:
+                    self._refreshing = False
+
+        threading.Thread(target=_run, name="stop-gazetteer-refresh", daemon=True).start()
+
+    def search(
+        self,
+        query: str,
+        limit: int = 1,
+        min_score: float = 0.0,
+        trgm_threshold: float = 0.3,
+    ) -> Optional[List[dict]]:
+        """Best matches as `{stop_id, name, lon, lat, score}` dicts, best first.
+
+        Mirrors `WHERE name % q ORDER BY similarity DESC, name ASC LIMIT n`
+        followed by the caller's `score >= min_score` check. Returns None when
+        the snapshot is missing or stale.
+        """
+        if not self.is_fresh():
+            self.refresh_async()
+            return None
+        snap = self._snapshot
+
+        q_grams = trigrams(self._normalize(query))
+        if not q_grams:
+            return []
+
+        counts: Dict[int, int] = defaultdict(int)
+        for g in q_grams:
+            for i in snap.index.get(g, ()):
+                counts[i] += 1
+
+        n_q = len(q_grams)
+        cutoff = max(trgm_threshold, min_score)
+        scored = []
+        for i, common in counts.items():
+            score = common / (n_q + snap.sizes[i] - common)
+            if score >= cutoff:
+                scored.append((-score, snap.stops[i][1], i))
+        scored.sort()
+
+        out = []
+        for neg_score, _, i in scored[:limit]:
+            stop_id, name, lon, lat = snap.stops[i]
+            out.append(
+                {
+                    "stop_id": int(stop_id),
+                    "name": str(name),
+                    "lon": float(lon),
+                    "lat": float(lat),
+                    "score": -neg_score,
+                }
+            )
+        return out
@@ -13,7 +13,8 @@ for p in (_REPO_ROOT, _APP_DIR):
         sys.path.insert(0, p)
 
 from graph.graph import build_graph
-from services.routing_client import find_route
+from services.routing_client import iter_journeys
+from services.journey_views import materialize
 from services.geocoding_serv import geocode_address
 
 # --- Page Config ---
@@ -218,7 +219,7 @@ with col1:
 
     if show_raw_state and st.session_state.get("last_state"):
         with st.expander("🔍 Raw AI State"):
-            st.json(st.session_state["last_state"])
+            st.json(materialize(st.session_state["last_state"]))
 
 
 # ============================================================================
@@ -265,28 +266,33 @@ with col2:
 
     if raw_submit:
         with st.spinner("Calling routing server..."):
+            # Journeys are streamed: each one is rendered as soon as it arrives.
+            summary_slot = st.empty()
             try:
-                raw_result = find_route(
-                    start_lat=start_lat,
-                    start_lon=start_lon,
-                    end_lat=end_lat,
-                    end_lon=end_lon,
-                    max_transfers=max_transfers,
-                    walking_cutoff=walking_cutoff,
-                    restricted_modes=restricted_modes,
-                    weights={
-                        "time": w_time,
-                        "cost": w_cost,
-                        "walk": w_walk,
-                        "transfer": w_transfer
-                    }
-                )
-                
-                st.success(f"✅ Found {len(raw_result.get('journeys', []))} journeys")
-                
-                for i, journey in enumerate(raw_result.get("journeys", [])):
+                n_journeys = 0
+                for i, journey in enumerate(
+                    iter_journeys(
+                        start_lat=start_lat,
+                        start_lon=start_lon,
+                        end_lat=end_lat,
+                        end_lon=end_lon,
+                        max_transfers=max_transfers,
+                        walking_cutoff=walking_cutoff,
+                        restricted_modes=restricted_modes,
+                        include_geometry=True,  # raw view/map shows the paths
+                        weights={
+                            "time": w_time,
+                            "cost": w_cost,
+                            "walk": w_walk,
+                            "transfer": w_transfer
+                        }
+                    )
+                ):
+                    n_journeys += 1
                     with st.expander(f"🚌 Journey {i+1}"):
                         st.json(journey)
+
+                summary_slot.success(f"✅ Found {n_journeys} journeys")
                         
             except Exception as e:
                 st.error(f"❌ Server Error: {e}")
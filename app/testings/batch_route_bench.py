@@ -0,0 +1,51 @@
+# Compare N unary FindRoute calls against FindRoutesBatch, offline, using the
+# local stand-in server (simulated 5ms per RPC). Timings run with the result
+# cache off; with it on, both paths snap endpoints to ROUTE_CACHE_GRID_DEG, so
+# they route the same (snapped) coordinates and must agree as well.
+import os
+import random
+import time
+
+os.environ.setdefault("ROUTING_SERVER_ADDR", "localhost:50071")
+
+from app.services.local_routing_server import serve
+from app.services.routing_client import clear_route_cache, find_route, find_routes_batch
+
+N = 1000
+
+server = serve(os.environ["ROUTING_SERVER_ADDR"], delay_s=0.005)
+
+random.seed(0)
+pairs = [
+    {
+        "start_lat": 31.20 + random.random() * 0.05,
+        "start_lon": 29.90 + random.random() * 0.05,
+        "end_lat": 31.20 + random.random() * 0.05,
+        "end_lon": 29.90 + random.random() * 0.05,
+        "max_transfers": 1,
+    }
+    for _ in range(N)
+]
+
+start = time.time()
+loop_results = [find_route(**p, use_cache=False) for p in pairs]
+loop_s = time.time() - start
+
+start = time.time()
+batch_results = find_routes_batch(pairs, chunk_size=100, use_cache=False)
+batch_s = time.time() - start
+
+assert [r["num_journeys"] for r in loop_results] == [r["num_journeys"] for r in batch_results]
+
+# cached: batch first (fills the cache), then unary on a cleared cache
+clear_route_cache()
+cached_batch = find_routes_batch(pairs, chunk_size=100)
+clear_route_cache()
+cached_loop = [find_route(**p) for p in pairs]
+assert [r["num_journeys"] for r in cached_loop] == [r["num_journeys"] for r in cached_batch]
+
+print(f"{N} pairs")
+print(f"unary loop : {loop_s:.2f}s")
+print(f"batch      : {batch_s:.2f}s  ({loop_s / batch_s:.1f}x)")
+
+server.stop(0)
@@ -625,9 +625,10 @@ decoder = TripDecoder()
 # 2️⃣ فلترة وترتيب
 best_journeys = decoder.filter_sort(route_response)
 
-# 3️⃣ decoding
-for j in best_journeys:
-    j["readable_path"] = decoder.decode_path(j.get("path", []))
+# 3️⃣ decoding (كل الـ trips في query واحدة)
+readable_paths = decoder.decode_paths([j.get("path", []) for j in best_journeys])
+for j, readable_path in zip(best_journeys, readable_paths):
+    j["readable_path"] = readable_path
 
 # 4️⃣ فورمات باستخدام LLM
 final_text = format_server_journeys_for_user_llm(
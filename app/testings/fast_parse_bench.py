@@ -0,0 +1,71 @@
+# How much of a query log the rule-based parser resolves without the LLM.
+# Usage: python -m app.testings.fast_parse_bench [queries.txt]   (one query per line)
+# Stops come from GTFS_SNAPSHOT / the stop table when reachable, else from a
+# small built-in list of Alexandria stops so the script also runs offline.
+import os
+import sys
+import time
+
+from app.services import arabic_norm
+from app.services.fast_parse import fast_parse
+from app.services.geocoding_serv import stop_gazetteer
+from app.services.stop_gazetteer import StopGazetteer
+
+SAMPLE_LOG = [
+    "عايز اروح من سيدي جابر لمحطة مصر",
+    "ازاي اروح من محطة الرمل للمنشية",
+    "من فيكتوريا الى العصافرة",
+    "من سيدي بشر لحد محرم بك ازاي",
+    "عايز اروح من ميامي لكليوباترا بالمواصلات",
+    "من الموقف الجديد إلى محطة مصر لو سمحت",
+    "ازاي اوصل من الابراهيمية لسموحة؟",
+    "من العصافرة لسيدي جابر الشيخ",
+    "انا في سموحة وعايز اروح المنشية",
+    "عايز اروح محطة مصر",
+    "من البيت للشغل",
+    "من محرم بك على الورديان",
+    "ازيك",
+    "من جليم لستانلي",
+    "عايز اروح من الشاطبي الى سبورتنج",
+    "ايه افضل طريق من المندرة للرمل",
+    "من سيتي سنتر لمحطة مصر",
+    "من كامب شيزار لسيدي بشر",
+    "عايز اروح لمحطة مصر من سيدي جابر",
+    "من المعمورة الى المنتزه",
+]
+
+BUILTIN_STOPS = [
+    "سيدي جابر", "سيدي جابر الشيخ", "محطة مصر", "محطة الرمل", "المنشية", "فيكتوريا", "العصافرة",
+    "سيدي بشر", "محرم بك", "ميامي", "كليوباترا", "الموقف الجديد", "الابراهيمية", "سموحة", "الورديان",
+    "جليم", "ستانلي", "الشاطبي", "سبورتنج", "المندرة", "كامب شيزار", "المعمورة", "المنتزه",
+]
+
+queries = SAMPLE_LOG
+if len(sys.argv) > 1:
+    with open(sys.argv[1], encoding="utf-8") as f:
+        queries = [line.strip() for line in f if line.strip()]
+
+
+gazetteer = stop_gazetteer()
+try:
+    gazetteer.refresh()
+except Exception as e:
+    print(f"(stop table unavailable: {e.__class__.__name__}; using {len(BUILTIN_STOPS)} built-in stops)")
+    gazetteer = StopGazetteer(
+        loader=lambda: [(i, name, 29.9, 31.2) for i, name in enumerate(BUILTIN_STOPS)],
+        normalize=arabic_norm.normalize,
+    )
+    gazetteer.refresh()
+
+threshold = float(os.getenv("FAST_PARSE_MIN_CONFIDENCE", "0.6"))
+resolved = 0
+start = time.time()
+for q in queries:
+    r = fast_parse(q, gazetteer=gazetteer)
+    ok = r["confidence"] >= threshold
+    resolved += ok
+    print(f"{'FAST' if ok else ' LLM'} {r['confidence']:.2f}  {q}  ->  {r['origin']} | {r['destination']}")
+elapsed = time.time() - start
+
+print(f"\nfast path resolved {resolved}/{len(queries)} ({resolved / len(queries):.0%}) at confidence >= {threshold}")
+print(f"{elapsed / len(queries) * 1000:.2f} ms per query")
@@ -0,0 +1,113 @@
+# Exercise the shared Nominatim client against a local mock HTTP server:
+# the process-wide rate limit holds across threads and coroutines, interactive
+# lookups jump ahead of queued batch ones, and the connection is kept alive.
+# Exits with an AssertionError when any of these regress (e.g. geopy falling
+# back to urllib without `requests` opens a connection per lookup).
+import asyncio
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ["NOMINATIM_DOMAIN"] = "127.0.0.1:8765"
+os.environ["NOMINATIM_SCHEME"] = "http"
+os.environ["NOMINATIM_RATE_PER_S"] = "5"
+
+from app.services import nominatim_client
+from app.services.nominatim_client import BATCH, INTERACTIVE
+
+RATE_GAP_S = 1 / 5
+served = []
+peers = set()
+grants = []
+
+# Record when the limiter hands out each token (what it actually controls;
+# arrival times at the server also include connection setup and jitter).
+_acquire, _acquire_async = nominatim_client.limiter.acquire, nominatim_client.limiter.acquire_async
+
+
+def _timed_acquire(*args, **kwargs):
+    ok = _acquire(*args, **kwargs)
+    grants.append(time.monotonic())
+    return ok
+
+
+async def _timed_acquire_async(*args, **kwargs):
+    await _acquire_async(*args, **kwargs)
+    grants.append(time.monotonic())
+
+
+nominatim_client.limiter.acquire = _timed_acquire
+nominatim_client.limiter.acquire_async = _timed_acquire_async
+
+
+class MockNominatim(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        served.append((time.monotonic(), self.path))
+        peers.add(self.client_address)
+        body = json.dumps([{"lat": "31.2001", "lon": "29.9187", "display_name": "Mock", "place_id": 1}]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+server = ThreadingHTTPServer(("127.0.0.1", 8765), MockNominatim)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+
+# 1) sequential lookups reuse one connection
+for i in range(3):
+    print(nominatim_client.geocode(f"seq {i}"))
+print("connections used:", len(peers))
+assert len(peers) == 1, f"expected one kept-alive connection, got {len(peers)}"
+
+# 2) 5 batch lookups queued, then an interactive one: it goes second at worst
+order = []
+
+
+def run(name, priority):
+    nominatim_client.geocode(name, priority=priority)
+    order.append(name)
+
+
+threads = [threading.Thread(target=run, args=(f"batch{i}", BATCH)) for i in range(5)]
+for t in threads:
+    t.start()
+time.sleep(0.05)
+threads.append(threading.Thread(target=run, args=("interactive", INTERACTIVE)))
+threads[-1].start()
+for t in threads:
+    t.join()
+print("completion order:", order)
+# a batch lookup may already hold the token when the interactive one arrives
+assert "interactive" in order[:2], order
+assert order.index("interactive") < order.index("batch1"), order
+
+
+# 3) async lookups share the same limiter
+async def main():
+    start = time.monotonic()
+    results = await asyncio.gather(*(nominatim_client.geocode_async(f"async {i}") for i in range(5)))
+    print(f"async: {len(results)} results in {time.monotonic() - start:.2f}s", results[0])
+    await nominatim_client.close_async()
+
+
+asyncio.run(main())
+
+grant_gaps = [b - a for a, b in zip(grants, grants[1:])]
+# skip the first request: it also opened the connection, so it arrives late
+gaps = [b[0] - a[0] for a, b in zip(served[1:], served[2:])]
+print(f"{len(served)} requests, min gap {min(gaps):.3f}s at the server, "
+      f"{min(grant_gaps):.3f}s between tokens (limit {RATE_GAP_S:.3f}s)")
+assert len(served) == len(grants) == 14, (len(served), len(grants))
+assert min(grant_gaps) >= RATE_GAP_S - 0.01, grant_gaps
+assert min(gaps) >= RATE_GAP_S - 0.05, gaps
+server.shutdown()
+print("ok")
@@ -0,0 +1,114 @@
+# Payload size and decode time of the three RouteRequest.path_encoding layouts.
+# Runs offline: responses are produced by the local stand-in server's servicer.
+# "baseline ms" is the original hand-written eager conversion (coordinate paths
+# only); "dicts ms" (the default lazy=False path) should stay close to it.
+import time
+
+from app.services.journey_views import JourneyView
+from app.services.local_routing_server import LocalRoutingServicer
+from app.services.routing_client import _build_route_request, _response_to_dict, routing_pb2
+
+RUNS = 200
+
+servicer = LocalRoutingServicer()
+
+
+def _make_response(encoding: str):
+    req = _build_route_request(31.18, 29.88, 31.27, 29.99, max_transfers=1, path_encoding=encoding)
+    resp, _, _ = servicer._route(req)
+    # Pad to a realistic 50-journey response.
+    journeys = list(resp.journeys)
+    while len(resp.journeys) < 50:
+        resp.journeys.add().CopyFrom(journeys[len(resp.journeys) % len(journeys)])
+    resp.num_journeys = len(resp.journeys)
+    return resp.SerializeToString()
+
+
+def _baseline_dicts(resp) -> list:
+    """The eager conversion routing_client used before the views, for reference."""
+    journeys = []
+    for j in resp.journeys:
+        legs = []
+        for leg in j.legs:
+            if leg.HasField("walk"):
+                wl = leg.walk
+                legs.append({
+                    "type": "walk",
+                    "distance_meters": int(wl.distance_meters),
+                    "duration_minutes": int(wl.duration_minutes),
+                    "path": [{"lon": float(p.lon), "lat": float(p.lat)} for p in wl.path],
+                })
+            elif leg.HasField("trip"):
+                tl = leg.trip
+                stops = {}
+                for key, stop in (("from", getattr(tl, "from")), ("to", tl.to)):
+                    stops[key] = {
+                        "stop_id": int(stop.stop_id),
+                        "name": str(stop.name),
+                        "coord": {"lon": float(stop.coord.lon), "lat": float(stop.coord.lat)},
+                    }
+                legs.append({
+                    "type": "trip",
+                    "trip_id": str(tl.trip_id),
+                    "mode": str(tl.mode),
+                    "route_short_name": str(tl.route_short_name),
+                    "headsign": str(tl.headsign),
+                    "fare": float(tl.fare),
+                    "duration_minutes": int(tl.duration_minutes),
+                    **stops,
+                    "path": [{"lon": float(p.lon), "lat": float(p.lat)} for p in tl.path],
+                })
+            elif leg.HasField("transfer"):
+                tr = leg.transfer
+                legs.append({
+                    "type": "transfer",
+                    "from_trip_id": str(tr.from_trip_id),
+                    "to_trip_id": str(tr.to_trip_id),
+                    "from_trip_name": str(tr.from_trip_name),
+                    "to_trip_name": str(tr.to_trip_name),
+                    "walking_distance_meters": int(tr.walking_distance_meters),
+                    "duration_minutes": int(tr.duration_minutes),
+                    "path": [{"lon": float(p.lon), "lat": float(p.lat)} for p in tr.path],
+                })
+        s = j.summary
+        journeys.append({
+            "id": int(j.id),
+            "text_summary": str(j.text_summary),
+            "summary": {
+                "total_time_minutes": int(s.total_time_minutes),
+                "total_distance_meters": int(s.total_distance_meters),
+                "walking_distance_meters": int(s.walking_distance_meters),
+                "transfers": int(s.transfers),
+                "cost": float(s.cost),
+                "modes": list(s.modes),
+            },
+            "legs": legs,
+        })
+    return journeys
+
+
+def _bench(fn) -> float:
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        fn()
+    return (time.perf_counter() - start) / RUNS * 1000
+
+
+baseline_payload = _make_response("coordinates")
+baseline = _baseline_dicts(routing_pb2.RouteResponse.FromString(baseline_payload))
+assert _response_to_dict(routing_pb2.RouteResponse.FromString(baseline_payload))["journeys"] == baseline
+baseline_ms = _bench(lambda: _baseline_dicts(routing_pb2.RouteResponse.FromString(baseline_payload)))
+print(f"baseline ms (coordinates, eager): {baseline_ms:.2f}\n")
+
+print(f"{'encoding':<12} {'bytes':>9} {'parse ms':>9} {'dicts ms':>9} {'arrays ms':>10}")
+for encoding in ("coordinates", "packed", "polyline"):
+    payload = _make_response(encoding)
+    parse_ms = _bench(lambda: routing_pb2.RouteResponse.FromString(payload))
+    dicts_ms = _bench(lambda: _response_to_dict(routing_pb2.RouteResponse.FromString(payload)))
+    arrays_ms = _bench(
+        lambda: [
+            JourneyView(j).path_arrays()
+            for j in routing_pb2.RouteResponse.FromString(payload).journeys
+        ]
+    )
+    print(f"{encoding:<12} {len(payload):>9} {parse_ms:>9.2f} {dicts_ms:>9.2f} {arrays_ms:>10.2f}")
@@ -0,0 +1,79 @@
+# Plain vs prepared execution of the hot stop search, against a local Postgres:
+#   docker run --rm -p 5432:5432 -e POSTGRES_PASSWORD=postgres postgres:16
+# (DB_HOST/DB_PORT/DB_NAME/DB_USER/DB_PASSWORD as for geocoding; only pg_trgm
+# is needed, the data is a synthetic temp table.)
+import os
+import random
+import time
+
+import psycopg2
+
+from app.services.arabic_norm import normalize
+from app.services.db_pool import PreparedQuery
+
+N_STOPS = 5000
+N_QUERIES = 2000
+
+conn = psycopg2.connect(
+    host=os.environ.get("DB_HOST", "localhost"),
+    port=int(os.environ.get("DB_PORT", "5432")),
+    database=os.environ.get("DB_NAME", "postgres"),
+    user=os.environ.get("DB_USER", "postgres"),
+    password=os.environ.get("DB_PASSWORD", "postgres"),
+)
+conn.autocommit = True
+cur = conn.cursor()
+
+random.seed(0)
+words = ["محطة", "الرمل", "سيدي", "جابر", "بشر", "محرم", "بك", "العصافرة", "المندرة", "الورديان", "ميامي", "كليوباترا"]
+names = [" ".join(random.sample(words, 3)) + f" {i}" for i in range(N_STOPS)]
+
+cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+cur.execute("CREATE TEMP TABLE bench_stop (stop_id int, name text, name_norm text, lon float8, lat float8);")
+cur.executemany(
+    "INSERT INTO bench_stop VALUES (%s, %s, %s, %s, %s)",
+    [(i, n, normalize(n), 29.9 + random.random() / 10, 31.2 + random.random() / 10) for i, n in enumerate(names)],
+)
+cur.execute("CREATE INDEX ON bench_stop USING gin (name_norm gin_trgm_ops);")
+cur.execute("ANALYZE bench_stop;")
+
+query = PreparedQuery(
+    "bench_stop_search",
+    "SELECT stop_id, name, lon, lat, similarity(name_norm, $1) AS score "
+    "FROM bench_stop WHERE name_norm % $1 ORDER BY score DESC, name ASC LIMIT $2",
+    ("text", "int"),
+)
+queries = [normalize(" ".join(random.sample(words, 2))) for _ in range(N_QUERIES)]
+
+start = time.time()
+for q in queries:
+    cur.execute(query.plain_sql, query.plain_params((q, 5)))
+    cur.fetchall()
+plain_s = time.time() - start
+
+cur.execute(query.prepare_sql)
+start = time.time()
+for q in queries:
+    cur.execute(query.execute_sql, (q, 5))
+    cur.fetchall()
+prepared_s = time.time() - start
+
+
+def planning_ms(sql, params):
+    cur.execute("EXPLAIN (ANALYZE, SUMMARY) " + sql, params)
+    for (line,) in cur.fetchall():
+        if line.startswith("Planning Time"):
+            return float(line.split(":")[1].split()[0])
+    return float("nan")
+
+
+# Planning time of one execution: plain re-plans every time; after a few runs
+# the prepared statement reuses its cached (generic) plan.
+plain_plan = planning_ms(query.plain_sql, query.plain_params((queries[0], 5)))
+prepared_plan = planning_ms(query.execute_sql, (queries[0], 5))
+
+print(f"{N_QUERIES} stop searches over {N_STOPS} stops")
+print(f"plain    : {plain_s:.2f}s  ({plain_s / N_QUERIES * 1000:.3f} ms/query, planning {plain_plan:.3f} ms)")
+print(f"prepared : {prepared_s:.2f}s  ({prepared_s / N_QUERIES * 1000:.3f} ms/query, planning {prepared_plan:.3f} ms)")
+print(f"speedup  : {plain_s / prepared_s:.2f}x")
+conn.close()
@@ -0,0 +1,39 @@
+# AsyncSingleFlight: duplicate calls share one flight, and a caller that joins
+# right after the last waiter was cancelled gets a fresh flight (a result, not
+# the abandoned flight's CancelledError).
+import asyncio
+
+from app.services.singleflight import AsyncSingleFlight
+
+flight = AsyncSingleFlight()
+started = []
+
+
+async def slow(value):
+    started.append(value)
+    await asyncio.sleep(0.1)
+    return value
+
+
+async def main():
+    # 1) three concurrent callers, one call
+    results = await asyncio.gather(*(flight.do("k", lambda: slow("shared")) for _ in range(3)))
+    print("coalesced:", results, "calls started:", len(started))
+    assert results == ["shared"] * 3 and len(started) == 1
+
+    # 2) cancel the only waiter, then rejoin the same key in the same loop tick
+    waiter = asyncio.ensure_future(flight.do("k", lambda: slow("first")))
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    try:
+        await waiter
+    except asyncio.CancelledError:
+        pass
+    rejoined = await flight.do("k", lambda: slow("second"))
+    print("rejoined after cancel:", rejoined)
+    assert rejoined == "second"
+    assert flight.in_flight() == 0
+
+
+asyncio.run(main())
+print("ok")